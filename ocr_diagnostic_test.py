@@ -14,6 +14,8 @@ from datetime import datetime
 
 sys.path.insert(0, '/Users/amir/projects/ai_player/src')
 
+TRACEBACK_PATH = "/tmp/ocr_diagnostic_last_traceback.txt"
+
 def test_ocr_engines():
     """Test available OCR engines with current game interface."""
     
@@ -100,9 +102,12 @@ def test_ocr_engines():
             print("   ❌ NO TEXT RESULTS FROM OCR MANAGER")
             
     except Exception as e:
-        print(f"❌ OCR Manager error: {e}")
+        # Keep stdout to a one-line summary; the full traceback goes to a side file
+        print(f"❌ OCR Manager error: {type(e).__name__}: {e}")
         import traceback
-        traceback.print_exc()
+        with open(TRACEBACK_PATH, 'w') as f:
+            f.write(traceback.format_exc())
+        print(f"   Traceback saved: {TRACEBACK_PATH}")
     
     # Test 3: Signal Fusion Engine OCR Signal
     print("\n" + "="*60)
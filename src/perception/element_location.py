@@ -8,12 +8,44 @@ import cv2
 import numpy as np
 import json
 import os
+import queue
 import subprocess
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Tuple, Optional, Any
 from dataclasses import dataclass
 
 
+# Audio feedback is spoken by one background worker so detection never waits on `say`
+_speech_queue: "queue.Queue[str]" = queue.Queue()
+_speech_worker: Optional[threading.Thread] = None
+_speech_worker_lock = threading.Lock()
+
+
+def _speech_worker_loop():
+    """Speak queued messages one at a time so they never overlap."""
+    while True:
+        message = _speech_queue.get()
+        try:
+            subprocess.run(['say', message], stdin=subprocess.DEVNULL,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except Exception:
+            print(f"🔊 Audio: {message}")
+        finally:
+            _speech_queue.task_done()
+
+
+def _enqueue_speech(message: str):
+    """Queue a message for the speech worker, starting it on first use."""
+    global _speech_worker
+    with _speech_worker_lock:
+        if _speech_worker is None:
+            _speech_worker = threading.Thread(target=_speech_worker_loop, name="speech", daemon=True)
+            _speech_worker.start()
+    _speech_queue.put(message)
+
+
 @dataclass
 class ElementMatch:
     """Represents a detected element match with normalized coordinates."""
@@ -46,6 +78,28 @@ class ElementLocationModule:
         self.template_library = self._load_template_library()
         self.template_images = self._load_template_images()
         
+        # Templates are immutable for the session: precompute their matching arrays once
+        self.prepared_templates = {
+            template_id: self._prepare_template(template_img)
+            for template_id, template_img in self.template_images.items()
+        }
+        
+        # Templates are matched concurrently; cv2.matchTemplate and numpy FFTs release the GIL
+        self.matching_workers = config.get('matching_workers', os.cpu_count() or 1)
+        
+        # 'ncc' (cv2.matchTemplate, all matching_methods), 'sqdiff_u8' (8-bit squared difference)
+        # or 'hybrid' (partially whitened correlation, robust to brightness shifts)
+        self.match_metric = config.get('match_metric', 'ncc')
+        self.hybrid_alpha = config.get('hybrid_alpha', 0.5)
+        self.hybrid_candidates = config.get('hybrid_candidates', 5)
+        self.subpixel_refinement = config.get('subpixel_refinement', True)
+        
+        # Static menu frames repeat: optionally reuse template matches for perceptually
+        # identical screenshots (off by default - near-identical frames share coordinates and OCR labels)
+        self.phash_cache_size = config.get('phash_cache_size', 0)
+        self.phash_max_distance = config.get('phash_max_distance', 2)
+        self._phash_match_cache: Dict[Tuple[int, Tuple[int, ...], Tuple[str, ...]], List[ElementMatch]] = {}
+        
         # Initialize OCR Manager for Module 2D integration
         self.ocr_manager = self._initialize_ocr_manager()
         
@@ -68,12 +122,9 @@ class ElementLocationModule:
         }
     
     def audio_signal(self, message: str):
-        """Provide audio feedback."""
+        """Provide audio feedback (non-blocking, spoken in order by a background worker)."""
         if self.audio_enabled:
-            try:
-                os.system(f'say "{message}"')
-            except:
-                print(f"🔊 Audio: {message}")
+            _enqueue_speech(message)
     
     def _initialize_ocr_manager(self):
         """Initialize OCR Manager for Module 2D text extraction."""
@@ -183,8 +234,6 @@ class ElementLocationModule:
         print("🔍 ELEMENT LOCATION - Module 2C")
         print("=" * 40)
         
-        matches = []
-        
         try:
             # Load screenshot with OpenCV
             screenshot = self._load_screenshot_opencv(screenshot_path)
@@ -192,31 +241,7 @@ class ElementLocationModule:
                 print("❌ Could not load screenshot with OpenCV")
                 return self._fallback_roi_detection(screenshot_path)
             
-            screen_height, screen_width = screenshot.shape[:2]
-            print(f"📐 Screenshot dimensions: {screen_width}x{screen_height}")
-            
-            # Method 1: OpenCV Template Matching (if template images available)
-            if self.template_images:
-                print("🎯 Running OpenCV template matching...")
-                opencv_matches = self._opencv_template_matching(screenshot, screen_width, screen_height, screenshot_path)
-                matches.extend(opencv_matches)
-            
-            # Method 2: ROI-based detection (for templates without images)
-            print("📍 Running ROI-based detection...")
-            roi_matches = self._roi_based_detection(screenshot_path, screen_width, screen_height)
-            
-            # Merge matches, preferring OpenCV results
-            all_template_ids = set(self.template_library.keys())
-            detected_ids = set(match.template_id for match in matches)
-            missing_ids = all_template_ids - detected_ids
-            
-            for template_id in missing_ids:
-                roi_match = next((m for m in roi_matches if m.template_id == template_id), None)
-                if roi_match:
-                    matches.append(roi_match)
-            
-            # Sort by confidence
-            matches.sort(key=lambda x: x.confidence, reverse=True)
+            matches = self._detect_in_screenshot(screenshot, screenshot_path)
             
             # Report results
             self._report_detection_results(matches)
@@ -228,6 +253,78 @@ class ElementLocationModule:
             self.audio_signal("Element detection failed")
             return self._fallback_roi_detection(screenshot_path)
     
+    def detect_all_elements_batched(self, screenshot_paths: List[str]) -> List[List[ElementMatch]]:
+        """
+        Detect elements in several screenshots (e.g. successive frames of a menu dwell).
+        
+        All screenshots are loaded up front, then matched back to back against the
+        templates prepared at init. With phash_cache_size > 0 (off by default), frames
+        perceptually identical to an earlier one reuse its template matches.
+        
+        Args:
+            screenshot_paths: Paths to screenshot images
+            
+        Returns:
+            One list of ElementMatch objects per screenshot, in input order
+        """
+        self.audio_signal(f"Starting element detection on {len(screenshot_paths)} screenshots")
+        print(f"🔍 ELEMENT LOCATION - Module 2C (batch of {len(screenshot_paths)})")
+        print("=" * 40)
+        
+        screenshots = [self._load_screenshot_opencv(path) for path in screenshot_paths]
+        results = []
+        
+        for index, (screenshot_path, screenshot) in enumerate(zip(screenshot_paths, screenshots), 1):
+            print(f"\n🖼️ Screenshot {index}/{len(screenshot_paths)}: {screenshot_path}")
+            
+            try:
+                if screenshot is None:
+                    print("❌ Could not load screenshot with OpenCV")
+                    results.append(self._fallback_roi_detection(screenshot_path))
+                    continue
+                
+                matches = self._detect_in_screenshot(screenshot, screenshot_path)
+                self._report_detection_results(matches)
+                results.append(matches)
+                
+            except Exception as e:
+                print(f"❌ Element detection error: {e}")
+                results.append(self._fallback_roi_detection(screenshot_path))
+        
+        return results
+    
+    def _detect_in_screenshot(self, screenshot: np.ndarray, screenshot_path: str) -> List[ElementMatch]:
+        """Template matching plus ROI fallback on one loaded screenshot, sorted by confidence."""
+        matches = []
+        
+        screen_height, screen_width = screenshot.shape[:2]
+        print(f"📐 Screenshot dimensions: {screen_width}x{screen_height}")
+        
+        # Method 1: OpenCV Template Matching (if template images available)
+        if self.template_images:
+            print("🎯 Running OpenCV template matching...")
+            opencv_matches = self._opencv_template_matching(screenshot, screen_width, screen_height, screenshot_path)
+            matches.extend(opencv_matches)
+        
+        # Method 2: ROI-based detection (for templates without images)
+        print("📍 Running ROI-based detection...")
+        roi_matches = self._roi_based_detection(screenshot_path, screen_width, screen_height)
+        
+        # Merge matches, preferring OpenCV results
+        all_template_ids = set(self.template_library.keys())
+        detected_ids = set(match.template_id for match in matches)
+        missing_ids = all_template_ids - detected_ids
+        
+        for template_id in missing_ids:
+            roi_match = next((m for m in roi_matches if m.template_id == template_id), None)
+            if roi_match:
+                matches.append(roi_match)
+        
+        # Sort by confidence
+        matches.sort(key=lambda x: x.confidence, reverse=True)
+        
+        return matches
+    
     def detect_all_elements_with_context(self, screenshot_path: str, screen_context: str) -> List[ElementMatch]:
         """
         LEVEL-1 ARCHITECTURAL CORRECTION: Context-gated element detection.
@@ -368,40 +465,369 @@ class ElementLocationModule:
             print(f"⚠️ OpenCV load error: {e}")
             return None
     
+    @staticmethod
+    def _prepare_template(template_img: np.ndarray) -> Dict[str, Any]:
+        """
+        Precompute the per-template arrays used by hybrid and 8-bit matching.
+        
+        Args:
+            template_img: BGR (or grayscale) template image
+            
+        Returns:
+            Dict with float pixels, per-channel sums, sum of squares and variance term
+        """
+        pixels = template_img if template_img.ndim == 3 else template_img[:, :, np.newaxis]
+        pixels = pixels.astype(np.float64)
+        template_h, template_w = pixels.shape[:2]
+        area = template_h * template_w
+        
+        sums = pixels.sum(axis=(0, 1))
+        sq = float((pixels ** 2).sum())
+        
+        return {
+            'pixels': pixels,
+            'shape': (template_h, template_w),
+            'area': area,
+            'sums': sums,
+            'sq': sq,
+            'var': sq - float((sums ** 2).sum()) / area
+        }
+    
+    def get_prepared_template(self, template_id: str) -> Dict[str, Any]:
+        """Return the precomputed matching arrays for a loaded template."""
+        return self.prepared_templates[template_id]
+    
+    def _template_spectra(self, template_id: str, shape: Tuple[int, int]) -> np.ndarray:
+        """
+        Per-channel float32 template FFTs zero-padded to the screenshot shape.
+        
+        Only the 'hybrid' metric needs these; they are not cached because a
+        full-screen spectrum per template would dwarf the templates themselves.
+        """
+        pixels = self.prepared_templates[template_id]['pixels'].astype(np.float32)
+        return np.stack([np.fft.rfft2(pixels[:, :, c], s=shape).astype(np.complex64)
+                         for c in range(pixels.shape[2])])
+    
+    def _prepare_fft_screenshot(self, screenshot: np.ndarray) -> Dict[str, Any]:
+        """
+        Per-screenshot data for the 'hybrid' metric: one float32 FFT per channel
+        shared by every template.
+        
+        Args:
+            screenshot: BGR (or grayscale) screenshot
+            
+        Returns:
+            Dict with image shape, channel-last image and per-channel spectra
+        """
+        image = screenshot if screenshot.ndim == 3 else screenshot[:, :, np.newaxis]
+        height, width = image.shape[:2]
+        
+        spectra = np.stack([np.fft.rfft2(image[:, :, c].astype(np.float32)).astype(np.complex64)
+                            for c in range(image.shape[2])])
+        
+        return {
+            'shape': (height, width),
+            'image': image,
+            'spectra': spectra
+        }
+    
+    def _opencv_template_scores(self, prepared: Dict[str, Any], template_id: str) -> Dict[int, np.ndarray]:
+        """
+        cv2.matchTemplate score map for every method in self.matching_methods.
+        
+        OpenCV already switches to DFT-based correlation for large templates,
+        working on crop-sized blocks, so no full-screen spectra are kept.
+        
+        Args:
+            prepared: Dict with the screenshot under 'image'
+            template_id: Loaded template (same channel count as the screenshot)
+            
+        Returns:
+            Dict mapping OpenCV method constant to its score map
+        """
+        template_img = self.template_images[template_id]
+        return {method: cv2.matchTemplate(prepared['image'], template_img, method)
+                for method in self.matching_methods}
+    
+    def _prepare_u8_screenshot(self, screenshot: np.ndarray) -> Dict[str, Any]:
+        """
+        Per-screenshot data for the 'sqdiff_u8' metric: the 8-bit image itself
+        plus a squared-sum integral image for bound-based pruning.
+        """
+        image = np.ascontiguousarray(screenshot, dtype=np.uint8)
+        _, integral_sq = cv2.integral2(image, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
+        if integral_sq.ndim == 2:
+            integral_sq = integral_sq[:, :, np.newaxis]
+        
+        return {
+            'shape': image.shape[:2],
+            'image': image,
+            'integral_sq': integral_sq
+        }
+    
+    def _u8_template_scores(self, prepared: Dict[str, Any], template_id: str,
+                            threshold: Optional[float] = None,
+                            log: Optional[List[str]] = None) -> Dict[int, np.ndarray]:
+        """
+        Template matching on uint8 pixels with TM_SQDIFF (OpenCV's 8-bit SIMD path).
+        
+        The raw squared difference is mapped to an NCC-compatible confidence
+        1 - sqdiff / (template.size * 255^2), so the usual thresholds apply.
+        With a threshold, locations are first bounded via
+        sqdiff >= (||I|| - ||T||)^2 and the match is skipped if none can pass.
+        
+        Args:
+            prepared: Output of _prepare_u8_screenshot
+            template_id: Loaded template (same channel count as the screenshot)
+            threshold: Optional confidence threshold used for bound-based pruning
+            log: Optional list to collect progress lines in (printed directly when None)
+            
+        Returns:
+            Dict mapping cv2.TM_SQDIFF to its confidence map (empty when pruned)
+        """
+        height, width = prepared['shape']
+        template_img = self.template_images[template_id]
+        template_h, template_w = template_img.shape[:2]
+        
+        out_h = height - template_h + 1
+        out_w = width - template_w + 1
+        if out_h <= 0 or out_w <= 0:
+            raise ValueError(f"template {template_w}x{template_h} larger than screenshot {width}x{height}")
+        
+        max_sqdiff = float(template_img.size) * 255.0 ** 2
+        
+        if threshold is not None:
+            integral_sq = prepared['integral_sq']
+            window_sq = (integral_sq[template_h:, template_w:] - integral_sq[:out_h, template_w:]
+                         - integral_sq[template_h:, :out_w] + integral_sq[:out_h, :out_w]).sum(axis=2)
+            template_norm = np.sqrt(self.prepared_templates[template_id]['sq'])
+            bound = 1.0 - (np.sqrt(np.maximum(window_sq, 0)) - template_norm) ** 2 / max_sqdiff
+            emit = print if log is None else log.append
+            candidates = int(np.count_nonzero(bound >= threshold))
+            if candidates == 0:
+                emit(f"      ✂️ Pruned: no location can reach {threshold:.2f}")
+                return {}
+            emit(f"      ✂️ Bound check: {candidates}/{bound.size} candidate locations")
+        
+        sqdiff = cv2.matchTemplate(prepared['image'], template_img, cv2.TM_SQDIFF)
+        return {cv2.TM_SQDIFF: 1.0 - sqdiff / max_sqdiff}
+    
+    def _hybrid_template_scores(self, prepared: Dict[str, Any], template_id: str,
+                                log: Optional[List[str]] = None) -> Dict[int, np.ndarray]:
+        """
+        Hybrid correlation: cross-power spectrum normalized to partial amplitude.
+        
+        R = F(img) * conj(F(tmpl)) / |F(img) * conj(F(tmpl))|^alpha gives a sharper,
+        brightness-insensitive peak than plain cross-correlation (alpha=0) while
+        staying less noise-prone than phase correlation (alpha=1). The response has
+        no absolute scale, so only its strongest local maxima are scored, with
+        TM_CCOEFF_NORMED evaluated directly on those windows.
+        
+        Args:
+            prepared: Output of _prepare_fft_screenshot
+            template_id: Loaded template (same channel count as the screenshot)
+            log: Optional list to collect progress lines in (printed directly when None)
+            
+        Returns:
+            Dict mapping cv2.TM_CCOEFF_NORMED to a score map that is zero
+            everywhere except at the evaluated candidate peaks
+        """
+        height, width = prepared['shape']
+        template = self.prepared_templates[template_id]
+        template_h, template_w = template['shape']
+        
+        out_h = height - template_h + 1
+        out_w = width - template_w + 1
+        if out_h <= 0 or out_w <= 0:
+            raise ValueError(f"template {template_w}x{template_h} larger than screenshot {width}x{height}")
+        
+        template_spectra = self._template_spectra(template_id, (height, width))
+        cross_power = (prepared['spectra'] * np.conj(template_spectra)).sum(axis=0)
+        magnitude = np.abs(cross_power)
+        cross_power /= np.power(np.maximum(magnitude, np.finfo(np.float32).tiny), self.hybrid_alpha)
+        response = np.fft.irfft2(cross_power, s=(height, width))[:out_h, :out_w]
+        
+        # Strongest local maxima of the hybrid response
+        peak_mask = cv2.dilate(response, np.ones((3, 3), np.uint8)) == response
+        peak_values = np.where(peak_mask, response, -np.inf).ravel()
+        count = min(self.hybrid_candidates, peak_values.size)
+        candidates = np.argpartition(-peak_values, count - 1)[:count]
+        
+        pixels = template['pixels']
+        template_zero_mean = pixels - template['sums'] / template['area']
+        template_energy = float((template_zero_mean ** 2).sum())
+        
+        scores = np.zeros((out_h, out_w))
+        for flat_index in candidates:
+            y, x = divmod(int(flat_index), out_w)
+            window = prepared['image'][y:y + template_h, x:x + template_w].astype(np.float64)
+            window_zero_mean = window - window.mean(axis=(0, 1))
+            denominator = np.sqrt(float((window_zero_mean ** 2).sum()) * template_energy)
+            if denominator > 0:
+                scores[y, x] = float((window_zero_mean * template_zero_mean).sum()) / denominator
+        
+        emit = print if log is None else log.append
+        emit(f"      🌀 Hybrid correlation: scored {count} candidate peaks")
+        
+        return {cv2.TM_CCOEFF_NORMED: scores}
+    
+    @staticmethod
+    def _subpixel_peaks(confidence_map: np.ndarray, threshold: float) -> List[Tuple[float, float, float]]:
+        """
+        Sub-pixel locations of the local maxima of a confidence map above threshold.
+        
+        Peaks are found with a 3x3 dilation; a 1D parabola per axis is then fitted
+        only on each peak's 3x3 neighbourhood, never over the whole map.
+        
+        Args:
+            confidence_map: Per-location match confidence (higher is better)
+            threshold: Minimum confidence for a peak
+            
+        Returns:
+            List of (x, y, confidence) sorted by confidence, best first
+        """
+        peak_mask = ((cv2.dilate(confidence_map, np.ones((3, 3), np.uint8)) == confidence_map)
+                     & (confidence_map >= threshold))
+        ys, xs = np.nonzero(peak_mask)
+        if ys.size == 0:
+            return []
+        
+        padded = np.pad(confidence_map.astype(np.float64), 1, mode='edge')
+        center = padded[ys + 1, xs + 1]
+        
+        def offset(before: np.ndarray, after: np.ndarray) -> np.ndarray:
+            curvature = before - 2 * center + after
+            with np.errstate(divide='ignore', invalid='ignore'):
+                delta = np.where(curvature < 0, 0.5 * (before - after) / curvature, 0.0)
+            return np.clip(delta, -0.5, 0.5)
+        
+        dx = offset(padded[ys + 1, xs], padded[ys + 1, xs + 2])
+        dy = offset(padded[ys, xs + 1], padded[ys + 2, xs + 1])
+        
+        order = np.argsort(-center, kind='stable')
+        return [(float(xs[i] + dx[i]), float(ys[i] + dy[i]), float(center[i])) for i in order]
+    
+    def _score_template(self, prepared: Dict[str, Any], template_id: str,
+                        threshold: float) -> Tuple[Optional[Tuple[int, int]], float, List[str]]:
+        """
+        Best match location and confidence for one template across all matching methods.
+        
+        Safe to run from worker threads: progress lines are returned, not printed.
+        
+        Returns:
+            Tuple of (best_match_location, best_confidence, log_lines)
+        """
+        log = []
+        best_match = None
+        best_confidence = 0.0
+        best_map = None
+        
+        try:
+            if self.match_metric == 'sqdiff_u8':
+                method_scores = self._u8_template_scores(prepared, template_id, threshold, log)
+            elif self.match_metric == 'hybrid':
+                method_scores = self._hybrid_template_scores(prepared, template_id, log)
+            else:
+                method_scores = self._opencv_template_scores(prepared, template_id)
+        except Exception as e:
+            log.append(f"      ⚠️ Template matching failed: {e}")
+            method_scores = {}
+        
+        # Try multiple matching methods
+        for method, result in method_scores.items():
+            try:
+                min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
+                
+                # Handle different method types (TM_SQDIFF maps are already confidences)
+                if method == cv2.TM_SQDIFF_NORMED:
+                    confidence = 1.0 - min_val
+                    match_loc = min_loc
+                else:
+                    confidence = max_val
+                    match_loc = max_loc
+                
+                if confidence > best_confidence:
+                    best_confidence = confidence
+                    best_match = match_loc
+                    best_map = 1.0 - result if method == cv2.TM_SQDIFF_NORMED else result
+                    
+            except Exception as e:
+                log.append(f"      ⚠️ Method {method} failed: {e}")
+                continue
+        
+        # Refine only peaks that pass the threshold
+        if self.subpixel_refinement and best_map is not None and best_confidence >= threshold:
+            peaks = self._subpixel_peaks(best_map, threshold)
+            if peaks:
+                best_match = peaks[0][:2]
+        
+        return best_match, best_confidence, log
+    
+    @staticmethod
+    def _perceptual_hash(screenshot: np.ndarray) -> int:
+        """64-bit DCT perceptual hash (pHash) of a screenshot."""
+        gray = screenshot if screenshot.ndim == 2 else cv2.cvtColor(screenshot, cv2.COLOR_BGR2GRAY)
+        small = cv2.resize(gray, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+        low_freq = cv2.dct(small)[:8, :8].ravel()
+        bits = low_freq > np.median(low_freq[1:])
+        return int(np.packbits(bits).view('>u8')[0])
+    
+    def _lookup_phash_matches(self, frame_hash: int, shape: Tuple[int, ...],
+                              template_ids: Tuple[str, ...]) -> Optional[List[ElementMatch]]:
+        """Cached matches for a frame within phash_max_distance bits of frame_hash, if any."""
+        if self.phash_cache_size <= 0:
+            return None
+        for (cached_hash, cached_shape, cached_ids), cached_matches in self._phash_match_cache.items():
+            if (cached_shape == shape and cached_ids == template_ids and
+                    bin(cached_hash ^ frame_hash).count('1') <= self.phash_max_distance):
+                return cached_matches
+        return None
+    
+    def _store_phash_matches(self, frame_hash: int, shape: Tuple[int, ...],
+                             template_ids: Tuple[str, ...], matches: List[ElementMatch]):
+        """Remember matches for a frame, evicting the oldest entry beyond phash_cache_size."""
+        if self.phash_cache_size <= 0:
+            return
+        while len(self._phash_match_cache) >= self.phash_cache_size:
+            self._phash_match_cache.pop(next(iter(self._phash_match_cache)))
+        self._phash_match_cache[(frame_hash, shape, template_ids)] = list(matches)
+    
     def _opencv_template_matching(self, screenshot: np.ndarray, screen_width: int, screen_height: int, screenshot_path: str = None) -> List[ElementMatch]:
-        """Perform OpenCV template matching."""
+        """Perform template matching (normalized, hybrid or 8-bit squared difference correlation, per match_metric)."""
         matches = []
         
-        for template_id, template_img in self.template_images.items():
+        # Only templates in the (possibly context-filtered) library are matched
+        template_ids = [tid for tid in self.template_images if tid in self.template_library]
+        
+        # Skip matching entirely on a perceptually identical frame (e.g. an idle menu)
+        frame_hash = self._perceptual_hash(screenshot)
+        cached_matches = self._lookup_phash_matches(frame_hash, screenshot.shape, tuple(template_ids))
+        if cached_matches is not None:
+            print(f"   ♻️ Reusing {len(cached_matches)} matches from identical frame (pHash {frame_hash:016x})")
+            return list(cached_matches)
+        
+        # Per-screenshot data shared by all templates (hybrid: one forward FFT)
+        if self.match_metric == 'sqdiff_u8':
+            prepared = self._prepare_u8_screenshot(screenshot)
+        elif self.match_metric == 'hybrid':
+            prepared = self._prepare_fft_screenshot(screenshot)
+        else:
+            prepared = {'shape': screenshot.shape[:2], 'image': screenshot}
+        
+        # Score every template concurrently; OCR and reporting stay sequential below
+        workers = max(1, min(self.matching_workers, len(template_ids)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            scored = list(executor.map(
+                lambda tid: self._score_template(prepared, tid, self.template_library[tid]['confidence_threshold']),
+                template_ids))
+        
+        for template_id, (best_match, best_confidence, log) in zip(template_ids, scored):
             template_data = self.template_library[template_id]
+            template_img = self.template_images[template_id]
             
             print(f"   🎯 Matching template: {template_data['name']}")
-            
-            best_match = None
-            best_confidence = 0.0
-            
-            # Try multiple matching methods
-            for method in self.matching_methods:
-                try:
-                    # Perform template matching
-                    result = cv2.matchTemplate(screenshot, template_img, method)
-                    min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
-                    
-                    # Handle different method types
-                    if method == cv2.TM_SQDIFF_NORMED:
-                        confidence = 1.0 - min_val
-                        match_loc = min_loc
-                    else:
-                        confidence = max_val
-                        match_loc = max_loc
-                    
-                    if confidence > best_confidence:
-                        best_confidence = confidence
-                        best_match = match_loc
-                        
-                except Exception as e:
-                    print(f"      ⚠️ Method {method} failed: {e}")
-                    continue
+            for line in log:
+                print(line)
             
             # Create match if confidence meets threshold
             if best_match and best_confidence >= template_data['confidence_threshold']:
@@ -445,6 +871,7 @@ class ElementLocationModule:
             else:
                 print(f"      ❌ No match above threshold (best: {best_confidence:.3f})")
         
+        self._store_phash_matches(frame_hash, screenshot.shape, tuple(template_ids), matches)
         return matches
     
     def _roi_based_detection(self, screenshot_path: str, screen_width: int, screen_height: int) -> List[ElementMatch]:
@@ -523,13 +950,15 @@ class ElementLocationModule:
         print("=" * 30)
         print(f"Total elements detected: {len(matches)}")
         
-        high_confidence = [m for m in matches if m.confidence >= 0.95]
-        medium_confidence = [m for m in matches if 0.8 <= m.confidence < 0.95]
-        low_confidence = [m for m in matches if m.confidence < 0.8]
+        # Bin confidences in one vectorized pass
+        confidences = np.fromiter((m.confidence for m in matches), dtype=np.float64, count=len(matches))
+        high_confidence = int(np.count_nonzero(confidences >= 0.95))
+        medium_confidence = int(np.count_nonzero((confidences >= 0.8) & (confidences < 0.95)))
+        low_confidence = int(np.count_nonzero(confidences < 0.8))
         
-        print(f"High confidence (≥0.95): {len(high_confidence)}")
-        print(f"Medium confidence (0.8-0.95): {len(medium_confidence)}")
-        print(f"Low confidence (<0.8): {len(low_confidence)}")
+        print(f"High confidence (≥0.95): {high_confidence}")
+        print(f"Medium confidence (0.8-0.95): {medium_confidence}")
+        print(f"Low confidence (<0.8): {low_confidence}")
         
         print(f"\n📍 Element Locations with Semantic Analysis:")
         for match in matches:
@@ -552,8 +981,15 @@ class ElementLocationModule:
         
         positions = []
         
-        for screenshot_path in test_screenshots:
-            matches = self.detect_all_elements(screenshot_path)
+        # Every screenshot must really be matched: cached coordinates would hide any deviation
+        phash_cache_size = self.phash_cache_size
+        self.phash_cache_size = 0
+        try:
+            detections = [self.detect_all_elements(screenshot_path) for screenshot_path in test_screenshots]
+        finally:
+            self.phash_cache_size = phash_cache_size
+        
+        for screenshot_path, matches in zip(test_screenshots, detections):
             target_match = next((m for m in matches if m.template_id == template_id), None)
             
             if target_match:
@@ -95,6 +95,35 @@ class GameScreenCapture:
             self._audio_signal(f"Screen capture failed: {e}")
             return None
     
+    def capture_screen_bgr(self) -> Optional[np.ndarray]:
+        """
+        Full-screen capture straight to an OpenCV-ready BGR array.
+        
+        Skips the PIL conversion and any disk round-trip, so callers that
+        only need pixels for cv2 / OCR crops avoid a PNG encode entirely.
+        
+        Returns:
+            HxWx3 uint8 BGR array or None if capture fails
+        """
+        start_time = time.time()
+        
+        try:
+            screenshot = CGDisplayCreateImage(CGMainDisplayID())
+            
+            if not screenshot:
+                return None
+            
+            bgra = self._cgimage_to_bgra(screenshot)
+            if bgra is None:
+                return None
+            
+            self._update_performance_metrics(start_time)
+            return np.ascontiguousarray(bgra[:, :, :3])
+            
+        except Exception as e:
+            self._audio_signal(f"BGR screen capture failed: {e}")
+            return None
+    
     def _capture_game_window(self) -> Optional[Image.Image]:
         """
         Isolate and capture specific game window using window information.
@@ -211,15 +240,15 @@ class GameScreenCapture:
             self._audio_signal(f"Window enumeration failed: {e}")
             return None
     
-    def _cgimage_to_pil(self, cg_image) -> Optional[Image.Image]:
+    def _cgimage_to_bgra(self, cg_image) -> Optional[np.ndarray]:
         """
-        Convert CoreGraphics CGImage to PIL Image (RGB format).
+        View a CoreGraphics CGImage's pixel data as an HxWx4 BGRA array.
         
         Args:
             cg_image: CGImage from CoreGraphics
             
         Returns:
-            PIL Image in RGB format
+            BGRA numpy array (no copy when rows are unpadded)
         """
         try:
             # Get image data
@@ -235,9 +264,28 @@ class GameScreenCapture:
             image_array = np.frombuffer(data, dtype=np.uint8)
             image_array = image_array.reshape((height, bytes_per_row))
             
-            # Extract RGB channels (CoreGraphics often uses BGRA format)
-            # Adjust based on actual format - may need BGR -> RGB conversion
-            rgb_array = image_array[:, :width*4].reshape((height, width, 4))
+            # CoreGraphics rows may be padded past width*4 bytes
+            return image_array[:, :width*4].reshape((height, width, 4))
+            
+        except Exception as e:
+            self._audio_signal(f"CGImage to array conversion failed: {e}")
+            return None
+    
+    def _cgimage_to_pil(self, cg_image) -> Optional[Image.Image]:
+        """
+        Convert CoreGraphics CGImage to PIL Image (RGB format).
+        
+        Args:
+            cg_image: CGImage from CoreGraphics
+            
+        Returns:
+            PIL Image in RGB format
+        """
+        try:
+            # CoreGraphics uses BGRA format
+            rgb_array = self._cgimage_to_bgra(cg_image)
+            if rgb_array is None:
+                return None
             
             # Convert BGRA to RGB (drop alpha channel and swap B/R)
             rgb_image = rgb_array[:, :, [2, 1, 0]]  # BGR -> RGB
@@ -355,6 +403,23 @@ def create_screen_capture(config: Dict[str, Any] = None) -> GameScreenCapture:
     return GameScreenCapture(config)
 
 
+# Process-wide capture instance shared by scripts that grab the screen repeatedly
+_shared_capture: Optional[GameScreenCapture] = None
+
+
+def get_shared_screen_capture() -> GameScreenCapture:
+    """
+    Return the process-wide GameScreenCapture, creating it on first use.
+    
+    Keeps one capture context (and its window-info cache) for a whole test
+    run instead of building a new one per screenshot.
+    """
+    global _shared_capture
+    if _shared_capture is None:
+        _shared_capture = GameScreenCapture({'audio_feedback': False})
+    return _shared_capture
+
+
 # Validation and testing functions
 def validate_screen_capture():
     """Quick validation of screen capture functionality."""
@@ -23,10 +23,11 @@ Integration: Agent B MLOps foundation (ExperienceReplayBuffer, DLAT)
 """
 
 import torch
+import torch.nn.functional as F
 import torchvision.transforms as transforms
 from PIL import Image
 import numpy as np
-from typing import List, Dict, Tuple, Optional, Any
+from typing import List, Dict, Tuple, Optional, Any, Union
 import logging
 import time
 from pathlib import Path
@@ -65,6 +66,8 @@ class YOLODetectionEngine:
         self.model = None
         self.device = self._setup_device(use_mps)
         self.using_real_yolo = False  # Track if using real YOLOv8 or dummy model
+        self._transform = None  # Fallback-model preprocessing, built on first use
+        self._normalize_stats = None  # (mean, std) device tensors for GPU preprocessing
         self.performance_metrics = {
             'total_inferences': 0,
             'average_inference_time': 0.0,
@@ -101,13 +104,56 @@ class YOLODetectionEngine:
         
         return device
     
+    def synchronize(self):
+        """Block until queued device work finishes (no-op on CPU), for accurate timing."""
+        if self.device.type == 'cuda':
+            torch.cuda.synchronize()
+    
+    def export_tensorrt_fp16(self, engine_path: Optional[str] = None) -> Optional[str]:
+        """
+        Export the loaded Ultralytics model to a TensorRT FP16 engine (fixed 640x640, batch 1).
+        
+        Args:
+            engine_path: Where to keep the engine; reused as-is if it already exists
+            
+        Returns:
+            Path to the .engine file for YOLODetectionEngine(model_path=...),
+            or None without CUDA / an Ultralytics model, or if the export fails
+        """
+        if engine_path and Path(engine_path).exists():
+            return engine_path
+        if self.device.type != 'cuda' or not self.using_real_yolo:
+            return None
+        
+        try:
+            exported = self.model.export(format='engine', half=True, dynamic=False, imgsz=640)
+            if engine_path:
+                Path(engine_path).parent.mkdir(parents=True, exist_ok=True)
+                Path(exported).replace(engine_path)
+                exported = engine_path
+            self.logger.info(f"Exported TensorRT FP16 engine to {exported}")
+            return str(exported)
+        except Exception as e:
+            self.logger.error(f"TensorRT export failed: {e}")
+            return None
+    
     def _load_model(self):
         """
         Load YOLOv8 model for inference.
         
         Uses dummy model if no trained model available - ready for DLAT integration.
         """
-        if self.model_path and Path(self.model_path).exists():
+        if self.model_path and Path(self.model_path).suffix == '.engine' and Path(self.model_path).exists():
+            try:
+                # TensorRT engine exported by Ultralytics (fixed input shape, FP16)
+                from ultralytics import YOLO
+                self.model = YOLO(self.model_path, task='detect')
+                self.using_real_yolo = True
+                self.logger.info(f"Loaded TensorRT YOLOv8 engine from {self.model_path}")
+            except Exception as e:
+                self.logger.error(f"Failed to load TensorRT engine from {self.model_path}: {e}")
+                self._load_dummy_model()
+        elif self.model_path and Path(self.model_path).exists():
             try:
                 # Load trained YOLOv8 model (when available from DLAT pipeline)
                 self.model = torch.jit.load(self.model_path, map_location=self.device)
@@ -147,7 +193,83 @@ class YOLODetectionEngine:
             self.using_real_yolo = False
             self.logger.info(f"Loaded dummy YOLO model (YOLOv8 failed: {e}) - ready for DLAT training integration")
     
-    def run_yolo_inference(self, pil_image: Image.Image) -> Dict[str, Any]:
+    def _input_transform(self):
+        """Preprocessing transform for the fallback model, built once."""
+        if self._transform is None:
+            self._transform = transforms.Compose([
+                transforms.Resize((640, 640)),  # YOLOv8 standard input size
+                transforms.ToTensor(),
+                transforms.Normalize(mean=[0.485, 0.456, 0.406], 
+                                   std=[0.229, 0.224, 0.225])
+            ])
+        return self._transform
+    
+    @staticmethod
+    def _rgb_pixels(image: Union[Image.Image, np.ndarray]) -> np.ndarray:
+        """HWC uint8 RGB pixels; contiguous RGB arrays are used as-is (no copy)."""
+        if isinstance(image, np.ndarray):
+            return np.ascontiguousarray(image, dtype=np.uint8)
+        return np.array(image if image.mode == 'RGB' else image.convert('RGB'))
+    
+    @staticmethod
+    def _image_size(image: Union[Image.Image, np.ndarray]) -> Tuple[int, int]:
+        """(width, height) of a PIL image or HWC array, as PIL's Image.size."""
+        if isinstance(image, np.ndarray):
+            return tuple(image.shape[1::-1])
+        return image.size
+    
+    @torch.inference_mode()
+    def _preprocess(self, pil_images: List[Union[Image.Image, np.ndarray]]) -> torch.Tensor:
+        """
+        Fallback-model input batch (N, 3, 640, 640) on the engine device.
+        
+        On CUDA only the raw uint8 pixels are uploaded; scaling, resize and
+        normalization then run on the GPU instead of as separate CPU passes.
+        Images may also be given as RGB uint8 arrays already in HWC layout.
+        """
+        if self.device.type != 'cuda':
+            transform = self._input_transform()
+            return torch.stack([transform(Image.fromarray(image) if isinstance(image, np.ndarray) else image)
+                                for image in pil_images]).to(self.device)
+        
+        if self._normalize_stats is None:
+            self._normalize_stats = (
+                torch.tensor([0.485, 0.456, 0.406], device=self.device).view(1, 3, 1, 1),
+                torch.tensor([0.229, 0.224, 0.225], device=self.device).view(1, 3, 1, 1))
+        mean, std = self._normalize_stats
+        
+        resized = []
+        for image in pil_images:
+            hwc = torch.from_numpy(self._rgb_pixels(image)).pin_memory().to(self.device, non_blocking=True)
+            chw = hwc.permute(2, 0, 1).unsqueeze(0).float().div_(255.0)
+            resized.append(F.interpolate(chw, size=(640, 640), mode='bilinear',
+                                         align_corners=False, antialias=True))
+        return torch.cat(resized).sub_(mean).div_(std)
+    
+    @torch.inference_mode()
+    def preprocess(self, pil_image: Union[Image.Image, np.ndarray]) -> torch.Tensor:
+        """
+        Model-ready (1, 3, 640, 640) tensor on the engine device, for timing
+        forward() in isolation from PIL conversion.
+        
+        Accepts a PIL image or an RGB uint8 HWC array (skips the PIL conversion).
+        Ultralytics takes 0-1 RGB tensors with no normalization; the fallback
+        model gets the same input as run_yolo_inference.
+        """
+        if not self.using_real_yolo:
+            return self._preprocess([pil_image])
+        
+        chw = torch.from_numpy(self._rgb_pixels(pil_image)).to(self.device).permute(2, 0, 1).unsqueeze(0).float().div_(255.0)
+        return F.interpolate(chw, size=(640, 640), mode='bilinear', align_corners=False, antialias=True)
+    
+    def forward(self, input_tensor: torch.Tensor):
+        """Raw model output for a tensor from preprocess() (no result extraction)."""
+        with torch.inference_mode():
+            if self.using_real_yolo:
+                return self.model(input_tensor, verbose=False)
+            return self.model(input_tensor)
+    
+    def run_yolo_inference(self, pil_image: Union[Image.Image, np.ndarray]) -> Dict[str, Any]:
         """
         Core inference function - accepts PIL Image from M3A screen capture.
         
@@ -160,13 +282,17 @@ class YOLODetectionEngine:
             - labels: Class ID predictions  
             - scores: Confidence scores
             - inference_time: Performance metric
+            - preprocess_time: Portion of inference_time spent preparing the input
         """
         start_time = time.time()
+        preprocess_time = 0.0
         
         try:
             if self.using_real_yolo:
                 # Real YOLOv8 inference using Ultralytics
                 results = self.model(pil_image, verbose=False)
+                if results:
+                    preprocess_time = results[0].speed.get('preprocess', 0.0) / 1000.0
                 
                 # Extract detection data from Ultralytics results
                 if results and len(results) > 0:
@@ -184,19 +310,13 @@ class YOLODetectionEngine:
                     detections = []
             else:
                 # Dummy model processing
-                # Preprocessing for YOLOv8 input
-                transform = transforms.Compose([
-                    transforms.Resize((640, 640)),  # YOLOv8 standard input size
-                    transforms.ToTensor(),
-                    transforms.Normalize(mean=[0.485, 0.456, 0.406], 
-                                       std=[0.229, 0.224, 0.225])
-                ])
-                
-                # Convert PIL to tensor
-                input_tensor = transform(pil_image).unsqueeze(0).to(self.device)
+                # Preprocessing for YOLOv8 input (PIL to tensor)
+                preprocess_start = time.perf_counter()
+                input_tensor = self._preprocess([pil_image])
+                preprocess_time = time.perf_counter() - preprocess_start
                 
                 # YOLOv8 inference
-                with torch.no_grad():
+                with torch.inference_mode():
                     detections = self.model(input_tensor)
             
             # Process raw output
@@ -206,8 +326,9 @@ class YOLODetectionEngine:
                     'boxes': detection['boxes'].cpu(),
                     'labels': detection['labels'].cpu(), 
                     'scores': detection['scores'].cpu(),
-                    'image_size': pil_image.size,
-                    'inference_time': time.time() - start_time
+                    'image_size': self._image_size(pil_image),
+                    'inference_time': time.time() - start_time,
+                    'preprocess_time': preprocess_time
                 }
             else:
                 # No detections
@@ -215,8 +336,9 @@ class YOLODetectionEngine:
                     'boxes': torch.empty((0, 4)),
                     'labels': torch.empty((0,)),
                     'scores': torch.empty((0,)),
-                    'image_size': pil_image.size,
-                    'inference_time': time.time() - start_time
+                    'image_size': self._image_size(pil_image),
+                    'inference_time': time.time() - start_time,
+                    'preprocess_time': preprocess_time
                 }
             
             # Update performance metrics
@@ -233,11 +355,170 @@ class YOLODetectionEngine:
                 'boxes': torch.empty((0, 4)),
                 'labels': torch.empty((0,)),
                 'scores': torch.empty((0,)),
-                'image_size': pil_image.size,
+                'image_size': self._image_size(pil_image),
                 'inference_time': time.time() - start_time,
+                'preprocess_time': preprocess_time,
                 'error': str(e)
             }
     
+    def run_yolo_inference_batch(self, pil_images: List[Image.Image]) -> List[Dict[str, Any]]:
+        """
+        Batched variant of run_yolo_inference: one forward pass for all images.
+        
+        Args:
+            pil_images: PIL Images to detect on together
+            
+        Returns:
+            One raw detection dict per image (same keys as run_yolo_inference);
+            inference_time is the batch time amortized per image
+        """
+        if not pil_images:
+            return []
+        
+        start_time = time.time()
+        preprocess_time = 0.0
+        
+        try:
+            if self.using_real_yolo:
+                # Ultralytics batches a list of images into one forward pass
+                results = self.model(list(pil_images), verbose=False)
+                if results:
+                    preprocess_time = sum(r.speed.get('preprocess', 0.0) for r in results) / 1000.0
+                detections = [{
+                    'boxes': r.boxes.xyxy.cpu() if r.boxes is not None else torch.empty((0, 4)),
+                    'labels': r.boxes.cls.cpu() if r.boxes is not None else torch.empty((0,)),
+                    'scores': r.boxes.conf.cpu() if r.boxes is not None else torch.empty((0,))
+                } for r in results]
+            else:
+                # Preprocess the images into one (N, 3, 640, 640) tensor
+                preprocess_start = time.perf_counter()
+                input_tensor = self._preprocess(pil_images)
+                preprocess_time = time.perf_counter() - preprocess_start
+                
+                # The fallback model yields one detection dict per call, so each
+                # image of the preprocessed batch gets its own forward pass
+                with torch.inference_mode():
+                    detections = []
+                    for i in range(len(pil_images)):
+                        output = self.model(input_tensor[i:i + 1])
+                        detections.append(output[0] if isinstance(output, list) and output else None)
+            
+            per_image_time = (time.time() - start_time) / len(pil_images)
+            raw_results = []
+            for i, image in enumerate(pil_images):
+                detection = detections[i] if isinstance(detections, list) and i < len(detections) else None
+                raw_results.append({
+                    'boxes': detection['boxes'].cpu() if detection else torch.empty((0, 4)),
+                    'labels': detection['labels'].cpu() if detection else torch.empty((0,)),
+                    'scores': detection['scores'].cpu() if detection else torch.empty((0,)),
+                    'image_size': self._image_size(image),
+                    'inference_time': per_image_time,
+                    'preprocess_time': preprocess_time / len(pil_images)
+                })
+                self._update_performance_metrics(per_image_time)
+            
+            self.logger.debug(f"YOLOv8 batch inference of {len(pil_images)} images completed in "
+                            f"{time.time() - start_time:.3f}s")
+            
+            return raw_results
+            
+        except Exception as e:
+            self.logger.error(f"YOLOv8 batch inference failed: {e}")
+            per_image_time = (time.time() - start_time) / len(pil_images)
+            return [{
+                'boxes': torch.empty((0, 4)),
+                'labels': torch.empty((0,)),
+                'scores': torch.empty((0,)),
+                'image_size': self._image_size(image),
+                'inference_time': per_image_time,
+                'preprocess_time': 0.0,
+                'error': str(e)
+            } for image in pil_images]
+    
+    def run_yolo_inference_pipelined(self, pil_images: List[Image.Image]) -> List[Dict[str, Any]]:
+        """
+        Per-image inference with the preprocessing of image i+1 overlapped with
+        the forward pass of image i, using separate CUDA streams.
+        
+        Only the fallback model on CUDA is pipelined (Ultralytics does its own
+        preprocessing); everywhere else this is sequential run_yolo_inference.
+        
+        Args:
+            pil_images: PIL Images to detect on, in order
+            
+        Returns:
+            One raw detection dict per image (same keys as run_yolo_inference);
+            inference_time is the pipelined wall time amortized per image
+        """
+        if not pil_images:
+            return []
+        if self.using_real_yolo or self.device.type != 'cuda':
+            return [self.run_yolo_inference(image) for image in pil_images]
+        
+        start_time = time.time()
+        pre_stream = torch.cuda.Stream()
+        inf_stream = torch.cuda.Stream()
+        
+        try:
+            preprocess_time = 0.0
+            preprocess_start = time.perf_counter()
+            with torch.cuda.stream(pre_stream):
+                next_input = self._preprocess([pil_images[0]])
+            preprocess_time += time.perf_counter() - preprocess_start
+            
+            detections = []
+            for i in range(len(pil_images)):
+                # Barrier: image i's upload/resize must finish before its forward pass
+                inf_stream.wait_stream(pre_stream)
+                current_input = next_input
+                current_input.record_stream(inf_stream)
+                with torch.cuda.stream(inf_stream), torch.inference_mode():
+                    output = self.model(current_input)
+                
+                # Queue image i+1 while the GPU is busy with image i
+                if i + 1 < len(pil_images):
+                    preprocess_start = time.perf_counter()
+                    with torch.cuda.stream(pre_stream):
+                        next_input = self._preprocess([pil_images[i + 1]])
+                    preprocess_time += time.perf_counter() - preprocess_start
+                
+                # Copy-back blocks on inf_stream only, after the next upload is queued
+                detection = output[0] if isinstance(output, list) and output else None
+                detections.append({
+                    'boxes': detection['boxes'].cpu() if detection else torch.empty((0, 4)),
+                    'labels': detection['labels'].cpu() if detection else torch.empty((0,)),
+                    'scores': detection['scores'].cpu() if detection else torch.empty((0,))
+                })
+            
+            per_image_time = (time.time() - start_time) / len(pil_images)
+            raw_results = []
+            for image, detection in zip(pil_images, detections):
+                raw_results.append({
+                    **detection,
+                    'image_size': self._image_size(image),
+                    'inference_time': per_image_time,
+                    'preprocess_time': preprocess_time / len(pil_images)
+                })
+                self._update_performance_metrics(per_image_time)
+            
+            self.logger.debug(f"YOLOv8 pipelined inference of {len(pil_images)} images completed in "
+                            f"{time.time() - start_time:.3f}s")
+            
+            return raw_results
+            
+        except Exception as e:
+            self.logger.error(f"YOLOv8 pipelined inference failed: {e}")
+            per_image_time = (time.time() - start_time) / len(pil_images)
+            return [{
+                'boxes': torch.empty((0, 4)),
+                'labels': torch.empty((0,)),
+                'scores': torch.empty((0,)),
+                'image_size': self._image_size(image),
+                'inference_time': per_image_time,
+                'preprocess_time': 0.0,
+                'error': str(e)
+            } for image in pil_images]
+    
     def process_detections(self, raw_yolo_results: Dict[str, Any], 
                           screen_image: Image.Image) -> SemanticMap:
         """
@@ -442,21 +723,38 @@ def create_detection_engine(model_path: Optional[str] = None) -> YOLODetectionEn
 
 # Integration function for complete M3 pipeline
 def run_complete_perception_pipeline(screen_image: Image.Image, 
-                                   detection_engine: YOLODetectionEngine) -> SemanticMap:
+                                   detection_engine: YOLODetectionEngine,
+                                   timings: Optional[Dict[str, float]] = None) -> SemanticMap:
     """
     Complete M3 perception pipeline: Screen Capture → Detection → Semantic Mapping.
     
     Args:
         screen_image: PIL Image from M3A screen capture
         detection_engine: Configured YOLODetectionEngine
+        timings: Optional dict filled with per-stage times in milliseconds
+            ('preprocess_ms', 'inference_ms', 'postprocess_ms')
         
     Returns:
         SemanticMap: Final hierarchical game state representation
     """
+    if timings is not None:
+        detection_engine.synchronize()
+        stage_start = time.perf_counter()
+    
     # M3B: YOLOv8 object detection
     raw_detections = detection_engine.run_yolo_inference(screen_image)
     
+    if timings is not None:
+        detection_engine.synchronize()
+        inference_end = time.perf_counter()
+    
     # M3C: Semantic mapping and interpretation  
     semantic_map = detection_engine.process_detections(raw_detections, screen_image)
     
-    return semantic_map
\ No newline at end of file
+    if timings is not None:
+        preprocess_ms = raw_detections.get('preprocess_time', 0.0) * 1000
+        timings['preprocess_ms'] = preprocess_ms
+        timings['inference_ms'] = (inference_end - stage_start) * 1000 - preprocess_ms
+        timings['postprocess_ms'] = (time.perf_counter() - inference_end) * 1000
+    
+    return semantic_map
@@ -4,9 +4,72 @@ Provides guaranteed cleanup and focus management for all tests.
 """
 
 import subprocess
+import threading
 import time
 import os
 
+# Shared NSWorkspace handle for in-process focus management
+_WORKSPACE = None
+
+
+def get_workspace():
+    """Shared NSWorkspace handle (pyobjc), created on first use."""
+    global _WORKSPACE
+    
+    if _WORKSPACE is None:
+        from AppKit import NSWorkspace
+        _WORKSPACE = NSWorkspace.sharedWorkspace()
+    return _WORKSPACE
+
+
+def activate_app(app_name, timeout=2.0):
+    """
+    Bring app_name to the front and wait for the OS activation notification.
+    
+    Returns immediately if the app is already frontmost. Otherwise observes
+    NSWorkspaceDidActivateApplicationNotification before activating, then
+    pumps the run loop until it arrives (usually well under 50ms) or timeout.
+    
+    Returns:
+        True if app_name is frontmost afterwards
+    """
+    from AppKit import NSWorkspaceDidActivateApplicationNotification, NSWorkspaceApplicationKey
+    from Foundation import NSDate, NSRunLoop
+    
+    workspace = get_workspace()
+    
+    def is_frontmost():
+        frontmost_app = workspace.frontmostApplication()
+        return bool(frontmost_app) and frontmost_app.localizedName() == app_name
+    
+    if is_frontmost():
+        return True
+    
+    activated = threading.Event()
+    
+    def on_activate(notification):
+        app = notification.userInfo()[NSWorkspaceApplicationKey]
+        if app.localizedName() == app_name:
+            activated.set()
+    
+    # Register before activating so the notification can't be missed
+    center = workspace.notificationCenter()
+    observer = center.addObserverForName_object_queue_usingBlock_(
+        NSWorkspaceDidActivateApplicationNotification, None, None, on_activate)
+    
+    try:
+        if not workspace.launchApplication_(app_name):
+            return False
+        
+        deadline = time.monotonic() + timeout
+        run_loop = NSRunLoop.currentRunLoop()
+        while not activated.is_set() and time.monotonic() < deadline:
+            run_loop.runUntilDate_(NSDate.dateWithTimeIntervalSinceNow_(0.01))
+        
+        return activated.is_set() or is_frontmost()
+    finally:
+        center.removeObserver_(observer)
+
 
 def guaranteed_vscode_return():
     """
@@ -13,6 +13,10 @@ It will check:
 Following test guidelines: Real detection or proper failure diagnosis
 """
 
+import asyncio
+import importlib.util
+import json
+import shutil
 import subprocess
 import sys
 import os
@@ -21,6 +25,36 @@ import time
 # Clean import path
 sys.path.insert(0, '/Users/amir/projects/ai_player/src')
 
+# Max tesseract processes in flight; each one is single-threaded and CPU-bound
+OCR_CONCURRENCY = int(os.environ.get('OCR_CONCURRENCY', os.cpu_count() or 1))
+OCR_TIMEOUT = 10
+
+# Single screenshot shared by every diagnosis stage
+SCREENSHOT_PATH = "/tmp/m2_ocr_test_screenshot.png"
+
+# Dune Legacy main-menu text regions, normalized (x1, y1, x2, y2).
+# Only these crops are OCR'd - full-screen layout analysis of the menu artwork is slow.
+MAIN_MENU_REGIONS = {
+    'title': (0.25, 0.05, 0.75, 0.25),
+    'button_single_player': (0.35, 0.35, 0.65, 0.43),
+    'button_multiplayer': (0.35, 0.45, 0.65, 0.53),
+    'button_options': (0.35, 0.55, 0.65, 0.63),
+    'button_quit': (0.35, 0.65, 0.65, 0.73),
+}
+
+# OCR-only images are written as JPEG: much cheaper to encode than PNG and
+# indistinguishable to tesseract at this quality. The shared PNG stays lossless
+# for template matching.
+OCR_JPEG_QUALITY = 90
+REGION_CROP_TEMPLATE = "/tmp/region_{name}.jpg"
+OCR_SCREENSHOT_PATH = "/tmp/m2_ocr_test_screenshot.jpg"
+
+# OCRManager instances are expensive to build (Vision model load, tessdata lookup)
+_OCR_SINGLETONS = {}
+
+# Successful engine probes are reused until the tesseract binary or interpreter changes
+OCR_PROBE_CACHE = '/tmp/ocr_probe_cache.json'
+
 def focus_game():
     """Focus the game for testing."""
     print("🎯 Focusing Dune Legacy...")
@@ -28,37 +62,107 @@ def focus_game():
                   capture_output=True)
     time.sleep(2)
 
-def check_ocr_engines():
-    """Check what OCR engines are actually available."""
-    print("🔍 CHECKING AVAILABLE OCR ENGINES")
-    print("="*50)
+def grab_screen():
+    """In-process full-screen grab as a BGR array (None when unavailable)."""
+    try:
+        from perception.screen_capture import get_shared_screen_capture
+        return get_shared_screen_capture().capture_screen_bgr()
+    except Exception as e:
+        print(f"⚠️ In-process capture unavailable: {e}")
+        return None
+
+def capture_screenshot(screenshot_path=SCREENSHOT_PATH, image=None):
+    """
+    Capture the screen once for all diagnosis stages.
     
-    ocr_results = {}
+    When an in-memory BGR image is supplied it is written directly;
+    otherwise falls back to the `screencapture` CLI.
+    """
+    if image is not None:
+        try:
+            import cv2
+            if cv2.imwrite(screenshot_path, image):
+                print(f"📸 Screenshot saved: {screenshot_path}")
+                return screenshot_path
+        except ImportError:
+            pass
     
-    # Check tesseract
+    result = subprocess.run(['screencapture', '-x', screenshot_path], 
+                          capture_output=True)
+    
+    if result.returncode != 0:
+        print("❌ Screenshot capture failed")
+        return None
+    
+    print(f"📸 Screenshot saved: {screenshot_path}")
+    return screenshot_path
+
+def _ocr_probe_cache_key():
+    """Cache key: tesseract path + mtime and the running interpreter."""
+    tesseract_path = shutil.which('tesseract')
+    tesseract_mtime = os.path.getmtime(tesseract_path) if tesseract_path else None
+    return [tesseract_path, tesseract_mtime, sys.version]
+
+def _probe_tesseract():
+    """Spawn `tesseract --version` and describe the result (uncached)."""
     try:
         result = subprocess.run(['tesseract', '--version'], 
                               capture_output=True, text=True, timeout=5)
         if result.returncode == 0:
             version = result.stdout.split('\n')[0]
-            ocr_results['tesseract'] = f"✅ AVAILABLE: {version}"
+            return f"✅ AVAILABLE: {version}"
         else:
-            ocr_results['tesseract'] = f"❌ ERROR: Return code {result.returncode}"
+            return f"❌ ERROR: Return code {result.returncode}"
     except FileNotFoundError:
-        ocr_results['tesseract'] = "❌ NOT INSTALLED"
+        return "❌ NOT INSTALLED"
     except subprocess.TimeoutExpired:
-        ocr_results['tesseract'] = "❌ TIMEOUT"
+        return "❌ TIMEOUT"
     except Exception as e:
-        ocr_results['tesseract'] = f"❌ ERROR: {e}"
+        return f"❌ ERROR: {e}"
+
+def _cached_tesseract_probe():
+    """
+    Tesseract probe memoized on disk, keyed by _ocr_probe_cache_key().
+    
+    Only successful probes are stored, so a transient failure is re-probed next run.
+    """
+    cache_key = _ocr_probe_cache_key()
     
-    # Check ocrmac
     try:
-        result = subprocess.run(['python3', '-c', 'import ocrmac; print("ocrmac available")'], 
-                              capture_output=True, text=True, timeout=5)
-        if result.returncode == 0:
+        with open(OCR_PROBE_CACHE, 'r') as f:
+            cached = json.load(f)
+        if cached.get('key') == cache_key and cached['tesseract'].startswith("✅"):
+            return cached['tesseract']
+    except (OSError, ValueError, KeyError):
+        pass
+    
+    status = _probe_tesseract()
+    if not status.startswith("✅"):
+        return status
+    
+    try:
+        with open(OCR_PROBE_CACHE, 'w') as f:
+            json.dump({'key': cache_key, 'tesseract': status}, f)
+    except OSError as e:
+        print(f"⚠️ Could not write OCR probe cache: {e}")
+    return status
+
+def check_ocr_engines():
+    """Check what OCR engines are actually available."""
+    print("🔍 CHECKING AVAILABLE OCR ENGINES")
+    print("="*50)
+    
+    ocr_results = {}
+    
+    # Check tesseract
+    ocr_results['tesseract'] = _cached_tesseract_probe()
+    
+    # Check ocrmac in-process - no need to cold-start another interpreter
+    try:
+        if importlib.util.find_spec('ocrmac') is not None:
             ocr_results['ocrmac'] = "✅ AVAILABLE: Python module installed"
         else:
-            ocr_results['ocrmac'] = f"❌ IMPORT ERROR: {result.stderr.strip()}"
+            ocr_results['ocrmac'] = "❌ IMPORT ERROR: No module named 'ocrmac'"
     except Exception as e:
         ocr_results['ocrmac'] = f"❌ ERROR: {e}"
     
@@ -68,45 +172,117 @@ def check_ocr_engines():
     
     return ocr_results
 
-def test_direct_tesseract_ocr():
-    """Test tesseract OCR directly on a screenshot."""
+async def _run_tesseract_async(image_path, sem, extra_args=()):
+    """Run one tesseract process without blocking the event loop."""
+    async with sem:
+        proc = await asyncio.create_subprocess_exec(
+            'tesseract', image_path, 'stdout', *extra_args,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=OCR_TIMEOUT)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            raise subprocess.TimeoutExpired(['tesseract', image_path], OCR_TIMEOUT)
+        return proc.returncode, stdout.decode(errors='replace'), stderr.decode(errors='replace')
+
+async def extract_text_async(image_paths, extra_args=()):
+    """OCR several images concurrently, bounded by OCR_CONCURRENCY."""
+    sem = asyncio.Semaphore(OCR_CONCURRENCY)
+    return await asyncio.gather(*[_run_tesseract_async(path, sem, extra_args)
+                                  for path in image_paths])
+
+def extract_text_concurrent(image_paths, extra_args=()):
+    """
+    Synchronous wrapper around extract_text_async.
+    
+    Returns a list of (returncode, stdout, stderr) tuples in input order.
+    """
+    return asyncio.run(extract_text_async(list(image_paths), extra_args))
+
+def crop_ui_regions(screenshot_path, regions=MAIN_MENU_REGIONS, image=None):
+    """
+    Write one JPEG per known UI region of the screenshot (OCR input only).
+    
+    Uses the in-memory BGR image when given instead of re-reading the file.
+    
+    Returns:
+        Dict of region name -> crop path (empty if the screenshot can't be cropped)
+    """
+    try:
+        import cv2
+    except ImportError:
+        print("⚠️ OpenCV not available - cannot crop UI regions")
+        return {}
+    
+    img = image if image is not None else cv2.imread(screenshot_path)
+    if img is None:
+        return {}
+    
+    height, width = img.shape[:2]
+    region_paths = {}
+    
+    for name, (x1, y1, x2, y2) in regions.items():
+        crop = img[int(y1 * height):int(y2 * height), int(x1 * width):int(x2 * width)]
+        if crop.size == 0:
+            continue
+        crop_path = REGION_CROP_TEMPLATE.format(name=name)
+        if cv2.imwrite(crop_path, crop, [cv2.IMWRITE_JPEG_QUALITY, OCR_JPEG_QUALITY]):
+            region_paths[name] = crop_path
+    
+    return region_paths
+
+def test_direct_tesseract_ocr(screenshot_path=SCREENSHOT_PATH, image=None):
+    """Test tesseract OCR directly on a screenshot (per UI region when the layout is known)."""
     print("\n🔬 TESTING DIRECT TESSERACT OCR")
     print("="*50)
     
     try:
-        # Take a screenshot first
-        screenshot_path = "/tmp/m2_ocr_test_screenshot.png"
-        
-        # Use screencapture to get a clean screenshot
-        result = subprocess.run(['screencapture', '-x', screenshot_path], 
-                              capture_output=True)
-        
-        if result.returncode != 0:
-            print("❌ Screenshot capture failed")
+        if not screenshot_path or not os.path.exists(screenshot_path):
+            print("❌ No screenshot available")
             return False
         
-        print(f"📸 Screenshot saved: {screenshot_path}")
+        region_paths = crop_ui_regions(screenshot_path, image=image)
         
-        # Test direct tesseract on the screenshot
-        ocr_result = subprocess.run(['tesseract', screenshot_path, 'stdout'], 
-                                  capture_output=True, text=True, timeout=10)
+        if region_paths:
+            # Single-line mode on each small crop, all regions in parallel
+            print(f"✂️ OCR on {len(region_paths)} UI regions")
+            results = extract_text_concurrent(region_paths.values(), ('--psm', '7'))
+            labels = list(region_paths)
+        else:
+            # Unknown layout - fall back to a full-screen pass
+            print("⚠️ No UI regions available, running full-screen OCR")
+            ocr_path = screenshot_path
+            if image is not None:
+                try:
+                    import cv2
+                    if cv2.imwrite(OCR_SCREENSHOT_PATH, image, [cv2.IMWRITE_JPEG_QUALITY, OCR_JPEG_QUALITY]):
+                        ocr_path = OCR_SCREENSHOT_PATH
+                except ImportError:
+                    pass
+            results = extract_text_concurrent([ocr_path])
+            labels = ['full_screen']
         
-        if ocr_result.returncode == 0:
-            text = ocr_result.stdout.strip()
-            print(f"📝 Tesseract extracted text:")
-            print(f"   Length: {len(text)} characters")
+        found_text = False
+        for label, (returncode, stdout, stderr) in zip(labels, results):
+            if returncode != 0:
+                print(f"❌ Tesseract failed on {label}: {stderr}")
+                continue
+            
+            text = stdout.strip()
             if text:
+                found_text = True
                 lines = text.split('\n')[:5]  # Show first 5 lines
+                print(f"📝 {label}: {len(text)} characters")
                 for i, line in enumerate(lines):
                     if line.strip():
                         print(f"   Line {i+1}: '{line.strip()}'")
-                return True
             else:
-                print("   ⚠️ No text detected by tesseract")
-                return False
-        else:
-            print(f"❌ Tesseract failed: {ocr_result.stderr}")
-            return False
+                print(f"   ⚠️ {label}: no text detected")
+        
+        if not found_text:
+            print("   ⚠️ No text detected by tesseract")
+        return found_text
             
     except subprocess.TimeoutExpired:
         print("❌ Tesseract OCR timed out")
@@ -115,7 +291,15 @@ def test_direct_tesseract_ocr():
         print(f"❌ Direct tesseract test failed: {e}")
         return False
 
-def test_m2_ocr_manager():
+def get_ocr(method):
+    """Return the shared OCRManager for method, constructing it on first use."""
+    ocr = _OCR_SINGLETONS.get(method)
+    if ocr is None:
+        from utils.ocr_manager import OCRManager
+        ocr = _OCR_SINGLETONS[method] = OCRManager(method=method)
+    return ocr
+
+def test_m2_ocr_manager(screenshot_path=SCREENSHOT_PATH):
     """Test the M2 OCR manager directly."""
     print("\n🧪 TESTING M2 OCR MANAGER")
     print("="*50)
@@ -130,13 +314,11 @@ def test_m2_ocr_manager():
             print(f"\n   Testing OCR method: {method}")
             
             try:
-                ocr = OCRManager(method=method)
+                ocr = get_ocr(method)
                 print(f"   ✅ {method} OCR manager initialized")
                 
-                # Test with a simple screenshot
-                screenshot_path = "/tmp/m2_ocr_test_screenshot.png"
-                
-                if os.path.exists(screenshot_path):
+                # Test with the shared screenshot
+                if screenshot_path and os.path.exists(screenshot_path):
                     results = ocr.extract_text(screenshot_path)
                     print(f"   📋 {method} results: {len(results)} text elements")
                     
@@ -161,7 +343,7 @@ def test_m2_ocr_manager():
     
     return True
 
-def test_perception_module_components():
+def test_perception_module_components(screenshot_path=None):
     """Test the perception module components."""
     print("\n🔧 TESTING PERCEPTION MODULE COMPONENTS")
     print("="*50)
@@ -176,14 +358,16 @@ def test_perception_module_components():
         
         perception = PerceptionModule(config)
         
-        # Test screenshot capture
-        screenshot = perception.capture_screen()
-        if screenshot:
+        # Test screenshot capture (always exercised: it is one of the components under test)
+        captured = perception.capture_screen()
+        if captured:
             print("✅ Screenshot capture working")
-            print(f"   Screenshot: {screenshot}")
+            print(f"   Screenshot: {captured}")
         else:
             print("❌ Screenshot capture failed")
         
+        # Detection runs on the screenshot shared with the other stages when there is one
+        screenshot = screenshot_path or captured
         # Test context detection
         if screenshot:
             context = perception.identify_screen_context(screenshot)
@@ -211,18 +395,22 @@ def main():
     # Check available OCR engines
     ocr_engines = check_ocr_engines()
     
+    # Capture once in-process; every stage below reads the same pixels / file
+    screenshot = grab_screen()
+    screenshot_path = capture_screenshot(image=screenshot)
+    
     # Test direct tesseract if available
     if "✅ AVAILABLE" in ocr_engines.get('tesseract', ''):
-        tesseract_working = test_direct_tesseract_ocr()
+        tesseract_working = test_direct_tesseract_ocr(screenshot_path, image=screenshot)
     else:
         tesseract_working = False
         print("\n⚠️ Skipping direct tesseract test - not available")
     
     # Test M2 OCR manager
-    ocr_manager_working = test_m2_ocr_manager()
+    ocr_manager_working = test_m2_ocr_manager(screenshot_path)
     
     # Test perception module
-    perception_working = test_perception_module_components()
+    perception_working = test_perception_module_components(screenshot_path)
     
     # Summary
     print(f"\n{'='*60}")
@@ -6,36 +6,80 @@ Incorporates development guidelines: focus management, audio feedback, timeout p
 CRITICAL: Uses guaranteed cleanup to prevent leaving user stranded.
 """
 
+import atexit
+import queue
 import subprocess
+import threading
 import time
 import os
 import sys
 
 # Add src to path for imports
 sys.path.append('./src')
-from utils.test_safety import guaranteed_cleanup, guaranteed_vscode_return
+from utils.test_safety import guaranteed_cleanup, guaranteed_vscode_return, activate_app, get_workspace
+
+# Post-launch readiness polling
+LAUNCH_POLL_INTERVAL = 0.05
+LAUNCH_TIMEOUT = 10.0
+
+# One in-process speech synthesizer for the whole run (None off macOS)
+try:
+    from AppKit import NSSpeechSynthesizer
+    _SYNTH = NSSpeechSynthesizer.alloc().initWithVoice_(None)
+except Exception:
+    _SYNTH = None
+
+_SPEECH_QUEUE = queue.Queue()
+_SPEECH_WORKER = None
+
+
+def _speech_worker_loop():
+    """Speak queued messages in order; starting a new one would cut off the current one."""
+    while True:
+        message = _SPEECH_QUEUE.get()
+        try:
+            while _SYNTH.isSpeaking():
+                time.sleep(0.05)
+            _SYNTH.startSpeakingString_(message)
+        except Exception:
+            print(f"🔊 Audio: {message}")
+        finally:
+            _SPEECH_QUEUE.task_done()
+
+
+def _flush_speech(timeout: float = 5.0):
+    """Let queued and in-progress speech finish before the interpreter exits."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if _SPEECH_QUEUE.unfinished_tasks == 0 and not _SYNTH.isSpeaking():
+            return
+        time.sleep(0.05)
 
 
 def audio_signal(message: str):
-    """Provide audio feedback during tests."""
-    try:
-        os.system(f'say "{message}"')
-    except:
+    """Provide audio feedback during tests (returns immediately; speech plays in the background)."""
+    global _SPEECH_WORKER
+    
+    if _SYNTH is None:
         print(f"🔊 Audio: {message}")
+        return
+    
+    if _SPEECH_WORKER is None:
+        _SPEECH_WORKER = threading.Thread(target=_speech_worker_loop, name="speech", daemon=True)
+        _SPEECH_WORKER.start()
+        atexit.register(_flush_speech)
+    _SPEECH_QUEUE.put(message)
 
 
 def ensure_app_focus(app_name: str = "Dune Legacy") -> bool:
     """
-    Simplified focus management using AppleScript.
+    Simplified focus management via NSWorkspace (no osascript spawn).
+    Waits for the activation notification instead of a fixed delay.
     """
     try:
-        script = f'''
-        tell application "{app_name}"
-            activate
-        end tell
-        '''
-        subprocess.run(['osascript', '-e', script], check=True)
-        time.sleep(0.5)
+        if not activate_app(app_name):
+            print(f"Failed to focus {app_name}")
+            return False
         return True
     except Exception as e:
         print(f"Failed to focus {app_name}: {e}")
@@ -45,44 +89,79 @@ def ensure_app_focus(app_name: str = "Dune Legacy") -> bool:
 def return_to_vscode():
     """Return focus to VS Code for report viewing."""
     try:
-        script = '''
-        tell application "Visual Studio Code"
-            activate
-        end tell
-        '''
-        subprocess.run(['osascript', '-e', script], check=True)
-        time.sleep(0.5)
-    except:
-        try:
-            script = '''
-            tell application "Code"
-                activate
-            end tell
-            '''
-            subprocess.run(['osascript', '-e', script], check=True)
-        except:
-            print("Could not return to VS Code")
+        for app_name in ("Visual Studio Code", "Code"):
+            if activate_app(app_name):
+                return
+        print("Could not return to VS Code")
+    except Exception:
+        print("Could not return to VS Code")
+
+
+def wait_for_launch(app_name: str = "Dune Legacy", timeout: float = LAUNCH_TIMEOUT) -> bool:
+    """
+    Poll NSWorkspace until the app reports isFinishedLaunching (or timeout).
+    The run loop is pumped between polls so runningApplications stays current.
+    """
+    try:
+        from Foundation import NSDate, NSRunLoop
+        workspace = get_workspace()
+    except Exception:
+        time.sleep(3)  # No pyobjc: fall back to the old fixed wait
+        return True
+    
+    run_loop = NSRunLoop.currentRunLoop()
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        match = next((a for a in workspace.runningApplications()
+                      if a.localizedName() == app_name), None)
+        if match is not None and match.isFinishedLaunching():
+            return True
+        run_loop.runUntilDate_(NSDate.dateWithTimeIntervalSinceNow_(LAUNCH_POLL_INTERVAL))
+    return False
+
+
+def grab_screen():
+    """In-process full-screen grab as a BGR array (None when unavailable)."""
+    try:
+        from perception.screen_capture import get_shared_screen_capture
+        return get_shared_screen_capture().capture_screen_bgr()
+    except Exception as e:
+        print(f"⚠️ In-process capture unavailable: {e}")
+        return None
 
 
 def capture_screen_simple():
     """
-    Simple screen capture using built-in macOS screenshot utility.
+    Simple screen capture via the persistent in-process grabber,
+    falling back to the built-in macOS screenshot utility.
+    Screenshots are written as uncompressed BMP (no PNG deflate cost).
     """
     try:
         timestamp = int(time.time())
-        screenshot_path = f"/tmp/ai_player_screenshot_{timestamp}.png"
+        screenshot_path = f"/tmp/ai_player_screenshot_{timestamp}.bmp"
+        
+        image = grab_screen()
+        if image is not None:
+            from PIL import Image
+            Image.fromarray(image[:, :, ::-1]).save(screenshot_path)
+            height, width = image.shape[:2]
+            print(f"✅ Screenshot captured: {screenshot_path}")
+            print(f"   Image info: {width} x {height}, in-process capture")
+            return screenshot_path
         
         # Capture screenshot
-        result = subprocess.run(['screencapture', '-x', screenshot_path], 
+        result = subprocess.run(['screencapture', '-x', '-t', 'bmp', screenshot_path], 
                               capture_output=True)
         
         if result.returncode == 0 and os.path.exists(screenshot_path):
             print(f"✅ Screenshot captured: {screenshot_path}")
             
-            # Get image info
-            result = subprocess.run(['file', screenshot_path], 
-                                  capture_output=True, text=True)
-            print(f"   Image info: {result.stdout.strip()}")
+            # Get image info straight from the BMP info header
+            with open(screenshot_path, 'rb') as f:
+                header = f.read(26)
+            width = int.from_bytes(header[18:22], 'little', signed=True)
+            height = abs(int.from_bytes(header[22:26], 'little', signed=True))  # negative = top-down rows
+            print(f"   Image info: {width} x {height}, BMP")
             
             return screenshot_path
         else:
@@ -97,28 +176,20 @@ def capture_screen_simple():
 def detect_text_simple(image_path: str):
     """
     Simple text detection using built-in macOS OCR (if available).
+    Raises FileNotFoundError if the image is missing.
     """
-    try:
-        # Try to use built-in OCR via shortcuts (macOS Monterey+)
-        # This is a placeholder - we'll improve this in full implementation
-        print("🔍 Attempting basic text detection...")
-        
-        # For now, just validate the image exists and has reasonable size
-        if os.path.exists(image_path):
-            file_size = os.path.getsize(image_path)
-            if file_size > 10000:  # Reasonable screenshot size
-                print(f"✅ Image appears valid (size: {file_size} bytes)")
-                return True
-            else:
-                print(f"⚠️ Image too small (size: {file_size} bytes)")
-                return False
-        else:
-            print("❌ Image file not found")
-            return False
-            
-    except Exception as e:
-        print(f"❌ Error in text detection: {e}")
-        return False
+    # Try to use built-in OCR via shortcuts (macOS Monterey+)
+    # This is a placeholder - we'll improve this in full implementation
+    print("🔍 Attempting basic text detection...")
+    
+    # For now, just validate the image has reasonable size (one stat call)
+    file_size = os.stat(image_path).st_size
+    if file_size > 10000:  # Reasonable screenshot size
+        print(f"✅ Image appears valid (size: {file_size} bytes)")
+        return True
+    
+    print(f"⚠️ Image too small (size: {file_size} bytes)")
+    return False
 
 
 def test_m2_simple():
@@ -144,7 +215,8 @@ def test_m2_simple():
             print("❌ Failed to launch game")
             raise Exception("Game launch failed")
         
-        time.sleep(3)  # Wait for game to start
+        if not wait_for_launch("Dune Legacy"):
+            print(f"⚠️ Game not reported as launched after {LAUNCH_TIMEOUT:.0f}s, continuing")
         audio_signal("Game launched")
         
         # Step 2: Ensure focus
@@ -167,7 +239,13 @@ def test_m2_simple():
         
         # Step 4: Basic analysis
         print("🔍 Step 4: Analyzing captured image...")
-        if detect_text_simple(screenshot_path):
+        try:
+            image_valid = detect_text_simple(screenshot_path)
+        except FileNotFoundError:
+            print("❌ Image file not found")
+            image_valid = False
+        
+        if image_valid:
             audio_signal("Menu analysis complete")
             print("✅ Menu reading test successful")
             success = True
@@ -16,53 +16,136 @@ This follows test guidelines by:
 import subprocess
 import sys
 import os
-import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 import cv2
 import numpy as np
 
 # Clean import path
 sys.path.insert(0, '/Users/amir/projects/ai_player/src')
 
+SCREENSHOT_PATH = "/tmp/m2_visual_test.png"
+SCREENSHOT_FALLBACK_PATH = "/tmp/m2_visual_test.bmp"
+
+# Retina captures are analysed at half resolution; UI size thresholds stay in
+# full-resolution pixels because detected boxes are scaled back before filtering
+ANALYSIS_SCALE = 0.5
+
+# Detection stages run concurrently; each prints its report as one block
+_REPORT_LOCK = threading.Lock()
+
+# Common UI color ranges (in HSV), inclusive bounds as for cv2.inRange
+UI_COLOR_RANGES = {
+    'blue_ui': ([100, 50, 50], [130, 255, 255]),    # Blue UI elements
+    'brown_ui': ([10, 50, 50], [25, 255, 255]),     # Brown/tan UI (common in Dune)
+    'gray_ui': ([0, 0, 100], [180, 30, 200]),       # Gray UI elements
+    'gold_ui': ([15, 100, 100], [35, 255, 255]),    # Gold/yellow UI
+}
+
+def build_color_lut(color_ranges):
+    """
+    Per-channel lookup table for cv2.LUT: entry [0, value, c] has bit i set when
+    value lies inside color i's bounds on channel c. The ranges are boxes, so
+    AND-ing the three channel lookups gives exact per-pixel color membership.
+    """
+    lut = np.zeros((1, 256, 3), dtype=np.uint8)
+    for bit, (lower, upper) in enumerate(color_ranges.values()):
+        for channel in range(3):
+            lut[0, lower[channel]:upper[channel] + 1, channel] |= 1 << bit
+    return lut
+
+UI_COLOR_LUT = build_color_lut(UI_COLOR_RANGES)
+
+# Button interiors are flat fill plus a label; busier boxes (terrain, unit sprites)
+# exceed gray std ~50 inside the outline
+BUTTON_MAX_VARIANCE = 2500.0
+
+# One row per button candidate: (x, y, w, h), normalized (x, y, w, h), area, aspect ratio
+BUTTON_REGION_DTYPE = np.dtype([
+    ('abs_coords', np.int32, (4,)),
+    ('norm_coords', np.float64, (4,)),
+    ('area', np.int64),
+    ('aspect_ratio', np.float64),
+])
+
 def focus_game():
-    """Focus the game for testing."""
+    """Focus the game for testing (returns as soon as the OS reports activation)."""
     print("🎯 Focusing Dune Legacy...")
-    subprocess.run(['osascript', '-e', 'tell application "Dune Legacy" to activate'], 
-                  capture_output=True)
-    time.sleep(2)
+    from utils.test_safety import activate_app
+    if not activate_app("Dune Legacy"):
+        print("⚠️ Dune Legacy did not come to the front")
+
+def grab_screen():
+    """In-process full-screen grab as a BGR array (None when unavailable)."""
+    try:
+        from perception.screen_capture import get_shared_screen_capture
+        return get_shared_screen_capture().capture_screen_bgr()
+    except Exception as e:
+        print(f"⚠️ In-process capture unavailable: {e}")
+        return None
+
+def screenshot_file(image_data):
+    """Path of the screenshot on disk, writing the in-memory capture on first request."""
+    if image_data['path'] is None:
+        if not cv2.imwrite(SCREENSHOT_PATH, image_data['bgr']):
+            raise RuntimeError("SCREENSHOT_WRITE_FAILED: Could not persist screenshot")
+        image_data['path'] = SCREENSHOT_PATH
+        print(f"💾 Screenshot saved: {SCREENSHOT_PATH}")
+    return image_data['path']
 
 def capture_and_analyze_screenshot():
     """Capture screenshot and analyze it visually."""
     print("📸 CAPTURING AND ANALYZING SCREENSHOT")
     print("="*50)
     
-    # Capture screenshot
-    screenshot_path = "/tmp/m2_visual_test.png"
-    result = subprocess.run(['screencapture', '-x', screenshot_path], 
-                          capture_output=True)
-    
-    if result.returncode != 0:
-        raise RuntimeError("SCREENSHOT_FAILED: Could not capture screen")
+    # Capture screenshot in memory; a file is only written if a path-based consumer asks
+    screenshot_path = None
+    img = grab_screen()
     
-    print(f"✅ Screenshot saved: {screenshot_path}")
+    if img is not None:
+        print("✅ Screenshot captured in memory")
+    else:
+        # CLI fallback: uncompressed BMP skips screencapture's PNG compression
+        screenshot_path = SCREENSHOT_FALLBACK_PATH
+        result = subprocess.run(['screencapture', '-x', '-t', 'bmp', screenshot_path], 
+                              capture_output=True)
+        
+        if result.returncode != 0:
+            raise RuntimeError("SCREENSHOT_FAILED: Could not capture screen")
+        
+        print(f"✅ Screenshot saved: {screenshot_path}")
     
-    # Load with OpenCV for analysis
+    # Load with OpenCV for analysis (only needed for the CLI fallback)
     try:
-        img = cv2.imread(screenshot_path)
+        if img is None:
+            img = cv2.imread(screenshot_path)
         if img is None:
             raise RuntimeError("OPENCV_LOAD_FAILED: Could not load screenshot")
         
         height, width = img.shape[:2]
         print(f"📐 Image dimensions: {width}x{height}")
         
-        # Convert to different color spaces for analysis
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
+        # Downscale once; edge / color analysis doesn't need native resolution
+        small = cv2.resize(img, None, fx=ANALYSIS_SCALE, fy=ANALYSIS_SCALE, interpolation=cv2.INTER_AREA)
+        
+        # Convert to different color spaces for analysis (fresh arrays: results
+        # are shared by the concurrent detectors and may outlive this frame)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        hsv = cv2.cvtColor(small, cv2.COLOR_BGR2HSV)
+        
+        # Sobel gradients shared by edge-based steps (same kernel/border Canny uses internally)
+        dx = cv2.Sobel(gray, cv2.CV_16S, 1, 0, borderType=cv2.BORDER_REPLICATE)
+        dy = cv2.Sobel(gray, cv2.CV_16S, 0, 1, borderType=cv2.BORDER_REPLICATE)
         
         return {
             'path': screenshot_path,
             'bgr': img,
             'gray': gray, 
             'hsv': hsv,
+            'dx': dx,
+            'dy': dy,
+            'scale': ANALYSIS_SCALE,
             'width': width,
             'height': height
         }
@@ -71,126 +154,151 @@ def capture_and_analyze_screenshot():
         raise RuntimeError(f"IMAGE_ANALYSIS_FAILED: {e}")
 
 def detect_button_like_regions(image_data):
-    """Detect rectangular button-like regions in the image."""
-    print("\n🔍 DETECTING BUTTON-LIKE REGIONS")
-    print("="*50)
+    """
+    Detect rectangular button-like regions in the image.
     
+    Returns:
+        Structured array (BUTTON_REGION_DTYPE) sorted by area, largest first
+    """
     gray = image_data['gray']
+    scale = image_data.get('scale', 1.0)
+    width, height = image_data['width'], image_data['height']
     
-    # Use edge detection to find rectangular shapes
-    edges = cv2.Canny(gray, 50, 150)
+    # Use edge detection to find rectangular shapes (reusing the precomputed gradients)
+    edges = cv2.Canny(image_data['dx'], image_data['dy'], 50, 150)
     
-    # Find contours
-    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    # Find contours; only their bounding boxes are used, so fewer points is cheaper
+    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_TC89_KCOS)
     
-    button_candidates = []
+    # Bounding rectangles of every contour as one (N, 4) array, at analysis scale and full resolution
+    small_rects = np.array([cv2.boundingRect(c) for c in contours], dtype=np.int32).reshape(-1, 4)
+    rects = np.rint(small_rects / scale).astype(np.int32)
+    w, h = rects[:, 2], rects[:, 3]
+    aspect = w / np.maximum(h, 1)
+    area = w.astype(np.int64) * h
     
-    for contour in contours:
-        # Get bounding rectangle
-        x, y, w, h = cv2.boundingRect(contour)
-        
-        # Filter for button-like dimensions
-        aspect_ratio = w / h if h > 0 else 0
-        area = w * h
-        
-        # Button criteria: reasonable size, rectangular shape
-        if (50 < w < 400 and      # Width reasonable for button
-            20 < h < 100 and      # Height reasonable for button  
-            1.5 < aspect_ratio < 8 and  # Rectangular shape
-            area > 1000):         # Minimum area
-            
-            # Normalize coordinates
-            norm_x = x / image_data['width']
-            norm_y = y / image_data['height'] 
-            norm_w = w / image_data['width']
-            norm_h = h / image_data['height']
-            
-            button_candidates.append({
-                'abs_coords': (x, y, w, h),
-                'norm_coords': (norm_x, norm_y, norm_w, norm_h),
-                'area': area,
-                'aspect_ratio': aspect_ratio
-            })
+    # Button criteria: reasonable size, rectangular shape
+    mask = ((w > 50) & (w < 400) &          # Width reasonable for button
+            (h > 20) & (h < 100) &          # Height reasonable for button
+            (aspect > 1.5) & (aspect < 8) & # Rectangular shape
+            (area > 1000))                  # Minimum area
+    
+    # Interior variance of every box from summed-area tables (four lookups per box),
+    # inset so the outline that produced the contour is not counted
+    ii, ii_sq = cv2.integral2(gray, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
+    inset = 2
+    x0 = small_rects[:, 0] + inset
+    y0 = small_rects[:, 1] + inset
+    x1 = np.maximum(small_rects[:, 0] + small_rects[:, 2] - inset, x0 + 1)
+    y1 = np.maximum(small_rects[:, 1] + small_rects[:, 3] - inset, y0 + 1)
+    x1, y1 = np.minimum(x1, gray.shape[1]), np.minimum(y1, gray.shape[0])
+    x0, y0 = np.minimum(x0, x1 - 1), np.minimum(y0, y1 - 1)
+    n = ((x1 - x0) * (y1 - y0)).astype(np.float64)
+    inner = ii[y1, x1] - ii[y0, x1] - ii[y1, x0] + ii[y0, x0]
+    inner_sq = ii_sq[y1, x1] - ii_sq[y0, x1] - ii_sq[y1, x0] + ii_sq[y0, x0]
+    mask &= inner_sq / n - (inner / n) ** 2 < BUTTON_MAX_VARIANCE
     
     # Sort by area (larger buttons first)
-    button_candidates.sort(key=lambda b: b['area'], reverse=True)
+    order = np.argsort(-area[mask], kind='stable')
     
-    print(f"🔘 Found {len(button_candidates)} button-like regions:")
+    button_candidates = np.zeros(order.size, dtype=BUTTON_REGION_DTYPE)
+    button_candidates['abs_coords'] = rects[mask][order]
+    button_candidates['norm_coords'] = button_candidates['abs_coords'] / np.array(
+        [width, height, width, height], dtype=np.float64)
+    button_candidates['area'] = area[mask][order]
+    button_candidates['aspect_ratio'] = aspect[mask][order]
     
-    for i, button in enumerate(button_candidates[:10]):  # Show top 10
-        x, y, w, h = button['abs_coords']
-        norm_coords = button['norm_coords']
-        area = button['area']
-        aspect = button['aspect_ratio']
+    with _REPORT_LOCK:
+        print("\n🔍 DETECTING BUTTON-LIKE REGIONS")
+        print("="*50)
+        print(f"🔘 Found {len(button_candidates)} button-like regions:")
         
-        print(f"   {i+1}. Region at ({x}, {y}) size {w}x{h}")
-        print(f"      Normalized: ({norm_coords[0]:.3f}, {norm_coords[1]:.3f}, {norm_coords[2]:.3f}, {norm_coords[3]:.3f})")
-        print(f"      Area: {area}, Aspect: {aspect:.2f}")
+        for i, button in enumerate(button_candidates[:10]):  # Show top 10
+            x, y, w, h = button['abs_coords']
+            norm_coords = button['norm_coords']
+            area = button['area']
+            aspect = button['aspect_ratio']
+            
+            print(f"   {i+1}. Region at ({x}, {y}) size {w}x{h}")
+            print(f"      Normalized: ({norm_coords[0]:.3f}, {norm_coords[1]:.3f}, {norm_coords[2]:.3f}, {norm_coords[3]:.3f})")
+            print(f"      Area: {area}, Aspect: {aspect:.2f}")
     
     return button_candidates
 
+def find_color_regions(mask, scale=1.0):
+    """
+    Bounding boxes (x, y, w, h, area) of UI-sized blobs in a color mask,
+    in full-resolution pixels when the mask was computed at `scale`.
+    """
+    # Find contours in the mask (any non-zero pixel is foreground)
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    
+    color_regions = []
+    for contour in contours:
+        x, y, w, h = (int(round(v / scale)) for v in cv2.boundingRect(contour))
+        area = w * h
+        
+        # Filter for reasonable UI element sizes
+        if area > 500 and w > 30 and h > 15:
+            color_regions.append((x, y, w, h, area))
+    
+    return color_regions
+
 def test_color_based_detection(image_data):
     """Test detection based on common UI colors."""
-    print("\n🎨 TESTING COLOR-BASED UI DETECTION")
-    print("="*50)
-    
     hsv = image_data['hsv']
+    scale = image_data.get('scale', 1.0)
     
-    # Common UI color ranges (in HSV)
-    color_ranges = {
-        'blue_ui': ([100, 50, 50], [130, 255, 255]),    # Blue UI elements
-        'brown_ui': ([10, 50, 50], [25, 255, 255]),     # Brown/tan UI (common in Dune)
-        'gray_ui': ([0, 0, 100], [180, 30, 200]),       # Gray UI elements
-        'gold_ui': ([15, 100, 100], [35, 255, 255]),    # Gold/yellow UI
-    }
+    # One pass over the HSV image labels every pixel with a bit per color range
+    channel_bits = cv2.LUT(hsv, UI_COLOR_LUT).reshape(-1, 3)
+    labels = (channel_bits[:, 0] & channel_bits[:, 1] & channel_bits[:, 2]).reshape(hsv.shape[:2])
+    
+    # Per-color contour search is independent; findContours releases the GIL
+    with ThreadPoolExecutor(max_workers=len(UI_COLOR_RANGES)) as executor:
+        regions_by_color = dict(zip(UI_COLOR_RANGES, executor.map(
+            lambda bit: find_color_regions(cv2.bitwise_and(labels, 1 << bit), scale),
+            range(len(UI_COLOR_RANGES)))))
     
     ui_regions = []
     
-    for color_name, (lower, upper) in color_ranges.items():
-        lower = np.array(lower)
-        upper = np.array(upper)
-        
-        # Create mask for this color range
-        mask = cv2.inRange(hsv, lower, upper)
+    with _REPORT_LOCK:
+        print("\n🎨 TESTING COLOR-BASED UI DETECTION")
+        print("="*50)
         
-        # Find contours in the mask
-        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        
-        color_regions = []
-        for contour in contours:
-            x, y, w, h = cv2.boundingRect(contour)
-            area = w * h
+        for color_name, color_regions in regions_by_color.items():
+            if color_regions:
+                print(f"   {color_name}: {len(color_regions)} regions")
+                # Show largest regions
+                color_regions.sort(key=lambda r: r[4], reverse=True)
+                for i, (x, y, w, h, area) in enumerate(color_regions[:3]):
+                    print(f"     {i+1}. ({x}, {y}) {w}x{h} area={area}")
             
-            # Filter for reasonable UI element sizes
-            if area > 500 and w > 30 and h > 15:
-                color_regions.append((x, y, w, h, area))
-        
-        if color_regions:
-            print(f"   {color_name}: {len(color_regions)} regions")
-            # Show largest regions
-            color_regions.sort(key=lambda r: r[4], reverse=True)
-            for i, (x, y, w, h, area) in enumerate(color_regions[:3]):
-                print(f"     {i+1}. ({x}, {y}) {w}x{h} area={area}")
-        
-        ui_regions.extend(color_regions)
+            ui_regions.extend(color_regions)
     
     return ui_regions
 
+@lru_cache(maxsize=1)
+def get_perception_module(config_items):
+    """
+    Shared PerceptionModule for a given config (frozenset of items), so repeated
+    pipeline runs reuse its loaded templates and OCR engines.
+    """
+    from perception.perception_module import PerceptionModule
+    return PerceptionModule(dict(config_items))
+
 def test_m2_perception_pipeline(image_data):
     """Test the actual M2 perception pipeline."""
     print("\n🔧 TESTING M2 PERCEPTION PIPELINE")
     print("="*50)
     
     try:
-        from perception.perception_module import PerceptionModule
-        
         config = {
             'confidence_threshold': 0.5,  # Lower threshold for testing
             'audio_feedback': False
         }
         
-        perception = PerceptionModule(config)
-        screenshot_path = image_data['path']
+        perception = get_perception_module(frozenset(config.items()))
+        screenshot_path = screenshot_file(image_data)
         
         # Test context detection
         context = perception.identify_screen_context(screenshot_path)
@@ -228,11 +336,17 @@ def main():
         # Capture and analyze screenshot
         image_data = capture_and_analyze_screenshot()
         
-        # Detect button-like regions using computer vision
-        button_regions = detect_button_like_regions(image_data)
+        # Contour-based button detection and LUT color detection share no state:
+        # run them side by side (OpenCV drops the GIL in Canny / LUT / findContours)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = {
+                executor.submit(detect_button_like_regions, image_data): 'buttons',
+                executor.submit(test_color_based_detection, image_data): 'colors'
+            }
+            results = {futures[future]: future.result() for future in as_completed(futures)}
         
-        # Test color-based UI detection
-        ui_regions = test_color_based_detection(image_data)
+        button_regions = results['buttons']
+        ui_regions = results['colors']
         
         # Test actual M2 perception pipeline
         m2_working = test_m2_perception_pipeline(image_data)
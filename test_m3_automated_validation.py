@@ -13,128 +13,282 @@ import sys
 import os
 import time
 import json
+import hashlib
+import shutil
+from dataclasses import asdict
+from enum import Enum
+from heapq import nlargest
+from operator import attrgetter
 from pathlib import Path
-from PIL import Image, ImageDraw, ImageFont
+from typing import Optional, Union
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+import cv2
 import numpy as np
 import subprocess
 
-# Add src to path for imports
-sys.path.append(str(Path(__file__).parent / 'src'))
+# Full tracebacks on failure (set M3_TRACEBACK=0 for one-line errors in tight loops)
+TRACEBACK_ON_FAIL = os.environ.get('M3_TRACEBACK', '1') == '1'
+if TRACEBACK_ON_FAIL:
+    import traceback
 
-def create_synthetic_gameplay_screenshot(save_path: str) -> bool:
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Add src to path for imports (once, even if this module is imported repeatedly)
+_SRC = str(Path(__file__).parent / 'src')
+if _SRC not in sys.path:
+    sys.path.append(_SRC)
+
+# Labels are drawn with OpenCV's built-in Hershey font (no font files / FreeType)
+LABEL_FONT = cv2.FONT_HERSHEY_PLAIN
+LABEL_SCALE = 1.0
+
+
+def draw_label(canvas: np.ndarray, position, text: str, fill):
+    """Draw text whose top-left corner is at `position` (cv2 anchors at the baseline)."""
+    (_, text_height), _ = cv2.getTextSize(text, LABEL_FONT, LABEL_SCALE, 1)
+    x, y = position
+    cv2.putText(canvas, text, (x, y + text_height), LABEL_FONT, LABEL_SCALE, fill, 1, cv2.LINE_AA)
+
+
+def fill_rectangle(canvas: np.ndarray, box, fill, outline=None, width: int = 1):
+    """
+    Draw a filled rectangle with an inner outline into an RGB array, matching
+    ImageDraw.rectangle (inclusive corners) with slice stores instead of per-pixel work.
+    """
+    x1, y1, x2, y2 = box
+    canvas[y1:y2 + 1, x1:x2 + 1] = fill[:3]
+    if outline is not None:
+        canvas[y1:y1 + width, x1:x2 + 1] = outline          # top
+        canvas[y2 - width + 1:y2 + 1, x1:x2 + 1] = outline  # bottom
+        canvas[y1:y2 + 1, x1:x1 + width] = outline          # left
+        canvas[y1:y2 + 1, x2 - width + 1:x2 + 1] = outline  # right
+
+
+# Synthetic gameplay screenshot layout: ((x1, y1, x2, y2), fill, outline, outline width)
+# rectangles drawn in order, then ((x, y), text, fill) labels. main() hashes
+# _SCREENSHOT_SPEC to reuse a previously generated image.
+SCREENSHOT_SIZE = (1920, 1080)
+DESERT_COLOR = (139, 121, 94)
+
+# Construction buttons
+CONSTRUCTION_BUTTONS = (
+    (1530, 930, 1620, 980, "REFINERY"),
+    (1630, 930, 1720, 980, "BARRACKS"),
+    (1730, 930, 1820, 980, "FACTORY"),
+    (1530, 990, 1620, 1040, "TURRET"),
+    (1630, 990, 1720, 1040, "RADAR"),
+    (1730, 990, 1820, 1040, "PALACE"),
+)
+
+# Harvesters (yellow squares)
+HARVESTER_POSITIONS = ((300, 400), (600, 300), (800, 700))
+
+
+def harvester_rectangle(x: int, y: int):
+    """Layout entry for a harvester whose top-left corner is at (x, y)."""
+    return ((x, y, x + 30, y + 20), (255, 255, 0), (200, 200, 0), 2)
+
+
+# Buildings (larger rectangles)
+BUILDINGS = (
+    (200, 200, 280, 260, (100, 100, 100)),  # Refinery
+    (500, 500, 580, 560, (0, 100, 200)),    # Factory
+    (900, 200, 960, 240, (200, 0, 0)),      # Turret
+)
+
+SCREENSHOT_RECTANGLES = (
+    ((20, 20, 300, 80), (0, 0, 0, 180), (255, 255, 0), 2),         # 1. Resource counters (top-left)
+    ((1720, 20, 1900, 200), (60, 40, 20), (100, 100, 100), 3),     # 2. Minimap (top-right)
+    ((20, 920, 400, 1060), (40, 40, 40), (0, 255, 0), 2),          # 3. Unit selection panel (bottom-left)
+    ((1520, 920, 1900, 1060), (50, 50, 50), (0, 100, 255), 2),     # 4. Construction menu (bottom-right)
+    *(((x1, y1, x2, y2), (80, 120, 160), (150, 200, 255), 1) for x1, y1, x2, y2, _ in CONSTRUCTION_BUTTONS),
+    # 5. Game units on map
+    *(harvester_rectangle(x, y) for x, y in HARVESTER_POSITIONS),
+    *(((x1, y1, x2, y2), color, (255, 255, 255), 2) for x1, y1, x2, y2, color in BUILDINGS),
+    ((400, 600, 520, 720), (150, 150, 150), (255, 255, 0), 3),     # 6. Command center (main base)
+)
+
+SCREENSHOT_LABELS = (
+    ((30, 30), "Spice: 2847", (255, 255, 0)),
+    ((30, 50), "Power: 89%", (0, 255, 0)),
+    ((1730, 25), "MINIMAP", (150, 150, 150)),
+    ((30, 930), "HARVESTER", (255, 255, 255)),
+    ((30, 950), "Health: 85/100", (255, 100, 100)),
+    ((30, 970), "Status: Collecting", (100, 255, 100)),
+    *(((x1 + 5, y1 + 15), text, (255, 255, 255)) for x1, y1, _, _, text in CONSTRUCTION_BUTTONS),
+    ((420, 640), "COMMAND", (255, 255, 255)),
+    ((430, 660), "CENTER", (255, 255, 255)),
+)
+
+_SCREENSHOT_SPEC = (SCREENSHOT_SIZE, DESERT_COLOR, SCREENSHOT_RECTANGLES, SCREENSHOT_LABELS,
+                    ('cv2.putText', LABEL_FONT, LABEL_SCALE))
+
+# Number of screenshot variants pushed through YOLO together in the batched check
+M3_BATCH_SIZE = int(os.environ.get('M3_BATCH', '4'))
+
+# TensorRT FP16 export of YOLOv8n for 640x640 input with a dynamic batch of up to
+# M3_BATCH_SIZE (single frames and the batched check), built on first CUDA run
+TENSORRT_ENGINE_PATH = f'test_assets/yolov8n_b{max(M3_BATCH_SIZE, 1)}.engine'
+
+# Drawing surface reused by every screenshot build (Image.fromarray copies it out)
+_CANVAS = np.empty((SCREENSHOT_SIZE[1], SCREENSHOT_SIZE[0], 3), dtype=np.uint8)
+
+# Per-stage latency budgets (ms) reported alongside the overall pipeline time
+STAGE_BUDGETS_MS = {
+    'preprocess_ms': 5.0,
+    'inference_ms': 85.0,
+    'postprocess_ms': 10.0,
+}
+
+
+def variant_rectangles(seed: int):
+    """Screenshot layout with the harvesters moved to seeded random map positions."""
+    rng = np.random.default_rng(seed)
+    base_harvesters = {harvester_rectangle(x, y) for x, y in HARVESTER_POSITIONS}
+    # Harvesters roam the open map area between the HUD panels
+    positions = rng.integers((100, 100), (1400, 850), size=(len(HARVESTER_POSITIONS), 2))
+    return (tuple(r for r in SCREENSHOT_RECTANGLES if r not in base_harvesters) +
+            tuple(harvester_rectangle(int(x), int(y)) for x, y in positions))
+
+
+def create_synthetic_gameplay_screenshot(save_path: Optional[str] = None,
+                                         seed: Optional[int] = None) -> Optional[Image.Image]:
     """
     Create a synthetic Dune Legacy gameplay screenshot for M3 testing.
     
     Args:
-        save_path: Path to save the synthetic screenshot
+        save_path: Optional path to also save the synthetic screenshot to
+        seed: Build a variant with randomly placed harvesters (None = standard layout)
         
     Returns:
-        bool: Success status
+        The screenshot image, or None if creation failed
     """
     try:
-        print("🎨 Creating synthetic gameplay screenshot...")
+        print(f"🎨 Creating synthetic gameplay screenshot{'' if seed is None else f' (variant {seed})'}...")
+        rectangles = SCREENSHOT_RECTANGLES if seed is None else variant_rectangles(seed)
         
         # Create realistic 1920x1080 gameplay image
-        img = Image.new('RGB', (1920, 1080), color=(139, 121, 94))  # Desert background
-        draw = ImageDraw.Draw(img)
+        canvas = _CANVAS
+        canvas[:] = DESERT_COLOR  # Desert background
         
         # Draw game interface elements that YOLOv8 should detect
+        for box, fill, outline, outline_width in rectangles:
+            fill_rectangle(canvas, box, fill=fill, outline=outline, width=outline_width)
         
-        # 1. Resource counters (top-left)
-        draw.rectangle([20, 20, 300, 80], fill=(0, 0, 0, 180), outline=(255, 255, 0), width=2)
-        draw.text((30, 30), "Spice: 2847", fill=(255, 255, 0))
-        draw.text((30, 50), "Power: 89%", fill=(0, 255, 0))
-        
-        # 2. Minimap (top-right)
-        draw.rectangle([1720, 20, 1900, 200], fill=(60, 40, 20), outline=(100, 100, 100), width=3)
-        draw.text((1730, 25), "MINIMAP", fill=(150, 150, 150))
-        
-        # 3. Unit selection panel (bottom-left)
-        draw.rectangle([20, 920, 400, 1060], fill=(40, 40, 40), outline=(0, 255, 0), width=2)
-        draw.text((30, 930), "HARVESTER", fill=(255, 255, 255))
-        draw.text((30, 950), "Health: 85/100", fill=(255, 100, 100))
-        draw.text((30, 970), "Status: Collecting", fill=(100, 255, 100))
-        
-        # 4. Construction menu (bottom-right)
-        draw.rectangle([1520, 920, 1900, 1060], fill=(50, 50, 50), outline=(0, 100, 255), width=2)
-        
-        # Construction buttons
-        buttons = [
-            (1530, 930, 1620, 980, "REFINERY"),
-            (1630, 930, 1720, 980, "BARRACKS"), 
-            (1730, 930, 1820, 980, "FACTORY"),
-            (1530, 990, 1620, 1040, "TURRET"),
-            (1630, 990, 1720, 1040, "RADAR"),
-            (1730, 990, 1820, 1040, "PALACE")
-        ]
+        for position, text, color in SCREENSHOT_LABELS:
+            draw_label(canvas, position, text, color)
         
-        for x1, y1, x2, y2, text in buttons:
-            draw.rectangle([x1, y1, x2, y2], fill=(80, 120, 160), outline=(150, 200, 255), width=1)
-            draw.text((x1 + 5, y1 + 15), text, fill=(255, 255, 255))
+        # The pipeline takes PIL input; fromarray copies, so the canvas can be reused
+        img = Image.fromarray(canvas)
         
-        # 5. Game units on map
-        # Harvesters (yellow squares)
-        harvester_positions = [(300, 400), (600, 300), (800, 700)]
-        for x, y in harvester_positions:
-            draw.rectangle([x, y, x+30, y+20], fill=(255, 255, 0), outline=(200, 200, 0), width=2)
-        
-        # Buildings (larger rectangles)
-        buildings = [
-            (200, 200, 280, 260, (100, 100, 100)),  # Refinery
-            (500, 500, 580, 560, (0, 100, 200)),    # Factory
-            (900, 200, 960, 240, (200, 0, 0))       # Turret
-        ]
-        
-        for x1, y1, x2, y2, color in buildings:
-            draw.rectangle([x1, y1, x2, y2], fill=color, outline=(255, 255, 255), width=2)
-        
-        # 6. Command center (main base)
-        draw.rectangle([400, 600, 520, 720], fill=(150, 150, 150), outline=(255, 255, 0), width=3)
-        draw.text((420, 640), "COMMAND", fill=(255, 255, 255))
-        draw.text((430, 660), "CENTER", fill=(255, 255, 255))
-        
-        # Save the synthetic screenshot
-        img.save(save_path)
-        print(f"✅ Synthetic screenshot saved: {save_path}")
+        # Save the synthetic screenshot only when a file is wanted
+        if save_path:
+            img.save(save_path, format='PNG', compress_level=1, optimize=False)  # Fast deflate for a test fixture
+            print(f"✅ Synthetic screenshot saved: {save_path}")
         print(f"   Resolution: {img.size}")
         
-        return True
+        return img
         
     except Exception as e:
         print(f"❌ Synthetic screenshot creation failed: {e}")
-        return False
+        return None
 
 
-def execute_m3_pipeline_validation(screenshot_path: str):
+def ensure_tensorrt_engine() -> Optional[str]:
+    """
+    Path to the TensorRT FP16 YOLOv8n engine, exporting it on first use.
+    Returns None without CUDA or when the export fails (PyTorch model is used).
+    """
+    import torch
+    
+    if not torch.cuda.is_available():
+        return None
+    if os.path.exists(TENSORRT_ENGINE_PATH):
+        return TENSORRT_ENGINE_PATH
+    
+    try:
+        from ultralytics import YOLO
+        print("⚙️ Exporting YOLOv8n to TensorRT FP16 (first run only)...")
+        exported = YOLO('yolov8n.pt').export(format='engine', half=True, imgsz=640, dynamic=True,
+                                             batch=max(M3_BATCH_SIZE, 1), workspace=4)
+        os.makedirs(os.path.dirname(TENSORRT_ENGINE_PATH), exist_ok=True)
+        shutil.move(exported, TENSORRT_ENGINE_PATH)
+        return TENSORRT_ENGINE_PATH
+    except Exception as e:
+        print(f"⚠️ TensorRT export unavailable ({e}), using the PyTorch model")
+        return None
+
+
+def _json_default(value):
+    """JSON fallback encoder: enums by value (as SemanticMap.to_dict), numpy via tolist."""
+    if isinstance(value, Enum):
+        return value.value
+    return value.tolist()
+
+
+def load_detection_engine():
+    """Build the YOLOv8 detection engine (run alongside screenshot creation)."""
+    import torch
+    from src.perception.yolo_detection_engine import YOLODetectionEngine
+    
+    # Let any remaining FP32 matmuls use TF32 tensor cores on Ampere+
+    torch.backends.cuda.matmul.allow_tf32 = True
+    
+    print("🧠 Initializing YOLOv8 Detection Engine...")
+    return YOLODetectionEngine(model_path=ensure_tensorrt_engine())
+
+
+def execute_m3_pipeline_validation(screenshot: Union[str, Image.Image], screenshot_path: Optional[str] = None,
+                                   detection_engine=None):
     """
     Execute complete M3 pipeline validation with synthetic screenshot.
     
     Args:
-        screenshot_path: Path to the test screenshot
+        screenshot: In-memory test screenshot, or a path to load it from
+        screenshot_path: Path the screenshot corresponds to; the semantic map
+            JSON is written next to it (defaults to `screenshot` when a path)
+        detection_engine: Already-built YOLODetectionEngine (built here if None)
     """
     try:
-        from src.perception.yolo_detection_engine import YOLODetectionEngine, run_complete_perception_pipeline
+        from src.perception.yolo_detection_engine import run_complete_perception_pipeline
         from src.perception.semantic_map import SemanticMap
         
         print("\n" + "="*60)
         print("M3 PIPELINE VALIDATION - Synthetic Game Screenshot")
         print("="*60)
         
-        # Load the test screenshot
-        test_image = Image.open(screenshot_path)
-        print(f"✅ Loaded test screenshot: {test_image.size}")
+        # Use the in-memory screenshot directly; only a path needs decoding
+        if isinstance(screenshot, Image.Image):
+            test_image = screenshot
+            print(f"✅ Using in-memory test screenshot: {test_image.size}")
+        else:
+            screenshot_path = screenshot_path or screenshot
+            test_image = Image.open(screenshot)
+            print(f"✅ Loaded test screenshot: {test_image.size}")
+        
+        # Initialize YOLOv8 detection engine (unless main() already loaded it)
+        if detection_engine is None:
+            detection_engine = load_detection_engine()
         
-        # Initialize YOLOv8 detection engine
-        print("🧠 Initializing YOLOv8 Detection Engine...")
-        detection_engine = YOLODetectionEngine()
+        # Warm-up pass so model load / backend setup is not counted in the timing
+        print("🔥 Warming up detection engine...")
+        run_complete_perception_pipeline(Image.new('RGB', test_image.size), detection_engine)
         
         # Execute complete M3 pipeline
         print("🔄 Executing M3 Pipeline: Screenshot → YOLOv8 → SemanticMap")
-        start_time = time.time()
+        stage_timings = {}
+        detection_engine.synchronize()
+        start_time = time.perf_counter()
         
-        semantic_map = run_complete_perception_pipeline(test_image, detection_engine)
+        semantic_map = run_complete_perception_pipeline(test_image, detection_engine, stage_timings)
         
-        pipeline_time = time.time() - start_time
+        detection_engine.synchronize()
+        pipeline_time = time.perf_counter() - start_time
         print(f"✅ M3 Pipeline completed in {pipeline_time:.3f}s")
         
         # Validate SemanticMap structure
@@ -156,59 +310,62 @@ def execute_m3_pipeline_validation(screenshot_path: str):
         
         if semantic_map.elements:
             print("\n🎯 DETECTION ANALYSIS:")
-            sorted_elements = sorted(semantic_map.elements, 
-                                   key=lambda x: x.confidence_score, reverse=True)
+            elements = semantic_map.elements
+            
+            # Validate coordinate normalization for every detection at once (map order)
+            img_width, img_height = test_image.size
+            boxes = np.array([e.bounding_box for e in elements], dtype=np.float64).reshape(-1, 4)
+            x1, y1, x2, y2 = boxes.T
+            coords_valid = ((x1 >= 0) & (x1 < img_width) & (y1 >= 0) & (y1 < img_height) &
+                            (x2 >= 0) & (x2 <= img_width) & (y2 >= 0) & (y2 <= img_height) &
+                            (x1 < x2) & (y1 < y2))
+            validation_results['det_coords_valid_mask'] = coords_valid.tolist()
             
-            for i, element in enumerate(sorted_elements[:5]):  # Top 5 detections
-                print(f"   Detection {i+1}:")
-                print(f"     Label: {element.element_label}")
-                print(f"     Semantic Value: {element.semantic_value}")
-                print(f"     Confidence: {element.confidence_score:.3f}")
-                print(f"     Bounding Box: {element.bounding_box}")
-                
-                # Validate coordinate normalization  
-                x1, y1, x2, y2 = element.bounding_box
-                img_width, img_height = test_image.size
-                
-                coords_in_bounds = (
-                    0 <= x1 < img_width and 0 <= y1 < img_height and
-                    0 <= x2 <= img_width and 0 <= y2 <= img_height and
-                    x1 < x2 and y1 < y2
-                )
-                
-                print(f"     Coordinates Valid: {'✅' if coords_in_bounds else '❌'}")
+            # Top 5 detections by confidence, without sorting the whole map
+            scores = list(map(attrgetter('confidence_score'), elements))
+            top_indices = nlargest(5, range(len(elements)), key=scores.__getitem__)
+            
+            # Format the report in memory and write it to stdout once
+            lines = []
+            for i, index in enumerate(top_indices):
+                element = elements[index]
+                coords_in_bounds = bool(coords_valid[index])
                 validation_results[f'det_{i+1}_coords_valid'] = coords_in_bounds
-                print()
+                lines.append(f"   Detection {i+1}:")
+                lines.append(f"     Label: {element.element_label}")
+                lines.append(f"     Semantic Value: {element.semantic_value}")
+                lines.append(f"     Confidence: {element.confidence_score:.3f}")
+                lines.append(f"     Bounding Box: {element.bounding_box}")
+                lines.append(f"     Coordinates Valid: {'✅' if coords_in_bounds else '❌'}")
+                lines.append("")
+            sys.stdout.write('\n'.join(lines) + '\n')
         
         # Generate JSON output
         print("📄 SEMANTIC MAP JSON SERIALIZATION:")
         try:
+            # DetectedElement is a dataclass: asdict gives every field in one call,
+            # and the encoders below handle the enum label and numpy values
             map_data = {
                 'timestamp': semantic_map.timestamp,
                 'screen_resolution': semantic_map.screen_resolution,
                 'detection_count': len(semantic_map.elements),
-                'elements': []
+                'elements': [asdict(element) for element in semantic_map.elements]
             }
             
-            for element in semantic_map.elements:
-                element_data = {
-                    'element_id': element.element_id,
-                    'element_label': element.element_label.name if hasattr(element.element_label, 'name') else str(element.element_label),
-                    'bounding_box': list(element.bounding_box),
-                    'confidence_score': float(element.confidence_score),
-                    'semantic_value': element.semantic_value,
-                    'detection_method': element.detection_method
-                }
-                map_data['elements'].append(element_data)
-            
-            json_output = json.dumps(map_data, indent=2)
-            print(json_output[:500] + "..." if len(json_output) > 500 else json_output)
+            if ORJSON_AVAILABLE:
+                json_bytes = orjson.dumps(map_data, default=_json_default,
+                                          option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+            else:
+                json_bytes = json.dumps(map_data, indent=2, default=_json_default).encode()
+            preview = json_bytes[:500].decode('utf-8', errors='ignore')
+            print(preview + "..." if len(json_bytes) > 500 else preview)
             
             # Save JSON output
-            json_path = screenshot_path.replace('.png', '_semantic_map.json')
-            with open(json_path, 'w') as f:
-                f.write(json_output)
-            print(f"\n💾 Full JSON output saved: {json_path}")
+            if screenshot_path:
+                json_path = screenshot_path.replace('.png', '_semantic_map.json')
+                with open(json_path, 'wb') as f:
+                    f.write(json_bytes)
+                print(f"\n💾 Full JSON output saved: {json_path}")
             
             validation_results['json_serializable'] = True
             
@@ -216,11 +373,35 @@ def execute_m3_pipeline_validation(screenshot_path: str):
             print(f"❌ JSON serialization failed: {e}")
             validation_results['json_serializable'] = False
         
+        # Batched path: several screenshot variants in a single forward pass
+        if M3_BATCH_SIZE > 1:
+            print(f"\n📦 BATCHED INFERENCE ({M3_BATCH_SIZE} variants):")
+            variants = [create_synthetic_gameplay_screenshot(seed=i) for i in range(M3_BATCH_SIZE)]
+            variants = [image for image in variants if image is not None]
+            
+            detection_engine.synchronize()
+            batch_start = time.perf_counter()
+            batch_results = detection_engine.run_yolo_inference_batch(variants)
+            detection_engine.synchronize()
+            batch_time = time.perf_counter() - batch_start
+            
+            print(f"   Batch Time: {batch_time * 1000:.1f}ms")
+            print(f"   Per-Image Time: {batch_time * 1000 / max(len(variants), 1):.1f}ms")
+            print(f"   Detections per Image: {[len(r['boxes']) for r in batch_results]}")
+            validation_results['batch_results_complete'] = (
+                len(batch_results) == M3_BATCH_SIZE and not any('error' in r for r in batch_results))
+        
         # Performance assessment
         print(f"\n⚡ PERFORMANCE METRICS:")
         print(f"   Pipeline Time: {pipeline_time:.3f}s")
         print(f"   Target: <100ms for real-time")
         print(f"   Achieved FPS: {1/pipeline_time:.1f}")
+        for stage, budget_ms in STAGE_BUDGETS_MS.items():
+            stage_ms = stage_timings.get(stage, 0.0)
+            print(f"   {stage.replace('_ms', '').capitalize()}: {stage_ms:.1f}ms "
+                  f"(budget {budget_ms:.0f}ms) {'✅' if stage_ms <= budget_ms else '⚠️'}")
+        if stage_timings:
+            print(f"   Hot Stage: {max(STAGE_BUDGETS_MS, key=stage_timings.get).replace('_ms', '')}")
         print(f"   Performance Rating: {'✅ Excellent' if pipeline_time < 0.05 else '✅ Good' if pipeline_time < 0.1 else '⚠️ Acceptable' if pipeline_time < 0.2 else '❌ Needs Optimization'}")
         
         # Overall validation assessment
@@ -253,8 +434,10 @@ def execute_m3_pipeline_validation(screenshot_path: str):
         
     except Exception as e:
         print(f"❌ M3 Pipeline validation failed: {e}")
-        import traceback
-        traceback.print_exc()
+        if TRACEBACK_ON_FAIL:
+            traceback.print_exc()
+        else:
+            print(f"❌ {e!r}")
         return False
 
 
@@ -271,14 +454,33 @@ def main():
         # Create test assets directory if needed
         os.makedirs('test_assets', exist_ok=True)
         
-        # Step 1: Create synthetic test screenshot
-        screenshot_success = create_synthetic_gameplay_screenshot(screenshot_path)
-        if not screenshot_success:
-            print("❌ Cannot proceed - Synthetic screenshot creation failed")
-            return False
+        # The engine load (weights from disk, device upload) is independent of the
+        # screenshot, so start it first and let it overlap with Step 1
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            engine_future = executor.submit(load_detection_engine)
+            
+            # Step 1: Create synthetic test screenshot (reused while the layout is unchanged)
+            signature = hashlib.blake2b(repr(_SCREENSHOT_SPEC).encode()).hexdigest()[:16]
+            cached_path = Path(f'test_assets/synthetic_{signature}.png')
+            if cached_path.exists():
+                shutil.copyfile(cached_path, screenshot_path)
+                screenshot = Image.open(cached_path)
+                print(f"✅ Reusing cached synthetic screenshot: {cached_path}")
+            else:
+                screenshot = create_synthetic_gameplay_screenshot(screenshot_path)
+                if screenshot is None:
+                    print("❌ Cannot proceed - Synthetic screenshot creation failed")
+                    return False
+                shutil.copyfile(screenshot_path, cached_path)
+            
+            try:
+                detection_engine = engine_future.result()
+            except Exception as e:
+                print(f"⚠️ Background engine load failed ({e}), retrying in validation")
+                detection_engine = None
         
-        # Step 2: Execute M3 pipeline validation
-        validation_success = execute_m3_pipeline_validation(screenshot_path)
+        # Step 2: Execute M3 pipeline validation on the in-memory image
+        validation_success = execute_m3_pipeline_validation(screenshot, screenshot_path, detection_engine)
         
         # Step 3: Report final results
         if validation_success:
@@ -299,8 +501,10 @@ def main():
         
     except Exception as e:
         print(f"\n❌ Test execution failed: {e}")
-        import traceback
-        traceback.print_exc()
+        if TRACEBACK_ON_FAIL:
+            traceback.print_exc()
+        else:
+            print(f"❌ {e!r}")
         return False
 
 
@@ -13,8 +13,11 @@ Compliance: AIP-SDS-V2.3 Module 3 validation
 """
 
 import sys
+import dataclasses
+import functools
 from pathlib import Path
 import time
+import numpy as np
 from PIL import Image, ImageDraw
 import json
 
@@ -31,10 +34,15 @@ except ImportError as e:
     print(f"❌ Module import failed: {e}")
     MODULES_AVAILABLE = False
 
+# DetectedElement fields every semantic map element must carry
+_REQUIRED_FIELDS = {'label', 'bbox', 'confidence'}
 
+
+@functools.lru_cache(maxsize=1)
 def create_test_image() -> Image.Image:
     """
     Create synthetic test image simulating Dune Legacy game interface.
+    Rendered once per process; callers only read it (copy() before drawing).
     
     Returns:
         PIL Image with mock game UI elements
@@ -146,13 +154,16 @@ def test_m3c_semantic_mapping(detection_engine, raw_results, test_image):
         print(f"✅ Timestamp: {semantic_map.timestamp}")
         print(f"✅ Screen resolution: {semantic_map.screen_resolution}")
         
-        # Validate DetectedElement structure
-        for element in semantic_map.elements:
-            assert isinstance(element, DetectedElement), "Elements must be DetectedElement instances"
-            assert hasattr(element, 'label'), "Must have label"
-            assert hasattr(element, 'bbox'), "Must have bbox"
-            assert hasattr(element, 'confidence'), "Must have confidence"
-            
+        # Validate DetectedElement structure: fields checked once on the class,
+        # then one type pass and one vectorized confidence range check
+        missing_fields = _REQUIRED_FIELDS - {f.name for f in dataclasses.fields(DetectedElement)}
+        assert not missing_fields, f"DetectedElement missing fields: {missing_fields}"
+        assert all(type(e) is DetectedElement for e in semantic_map.elements), \
+            "Elements must be DetectedElement instances"
+        confidences = np.fromiter((e.confidence for e in semantic_map.elements),
+                                  dtype=np.float32, count=len(semantic_map.elements))
+        assert ((confidences >= 0) & (confidences <= 1)).all(), "Confidence must be within [0, 1]"
+        
         if semantic_map.elements:
             sample_element = semantic_map.elements[0]
             print(f"✅ Sample element: {sample_element.label} - {sample_element.semantic_value}")
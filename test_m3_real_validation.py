@@ -22,36 +22,141 @@ from PIL import Image
 import numpy as np
 import subprocess
 import logging
+from heapq import nlargest
+from operator import attrgetter
+import Cocoa
+import Quartz
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Readiness polling: check often, give up after the old fixed delays
+READY_POLL_INTERVAL = 0.05
+
+# Compiled in-process AppleScripts (NSAppleScript) keyed by (action, app_name), built on first use
+_COMPILED_SCRIPTS = {}
+
+# Audio feedback system: macOS system sound per signal type, resolved once
+AUDIO_SIGNAL_SOUNDS = {
+    signal_type: f'/System/Library/Sounds/{sound_name}.aiff'
+    for signal_type, sound_name in {
+        'start': 'Ping',      # System start sound
+        'progress': 'Pop',    # Progress indication
+        'success': 'Glass',   # Success completion
+        'error': 'Basso',     # Error notification
+        'cleanup': 'Purr'     # Cleanup completion
+    }.items()
+}
+AUDIO_WAIT_TIMEOUT = 2.0
+
+# afplay processes still playing (waited on once in cleanup_and_refocus)
+_AUDIO_PROCESSES = []
+
 
-# Audio feedback system
 def play_audio_signal(signal_type: str):
     """
-    Play audio signals for user feedback during operations.
+    Play audio signals for user feedback during operations (returns immediately).
     
     Args:
         signal_type: Type of audio signal ('start', 'progress', 'success', 'error', 'cleanup')
     """
     try:
-        audio_signals = {
-            'start': 'Ping',      # System start sound
-            'progress': 'Pop',    # Progress indication
-            'success': 'Glass',   # Success completion
-            'error': 'Basso',     # Error notification
-            'cleanup': 'Purr'     # Cleanup completion
-        }
-        
-        sound_name = audio_signals.get(signal_type, 'Ping')
-        # Use macOS say command for audio feedback
-        subprocess.run(['afplay', f'/System/Library/Sounds/{sound_name}.aiff'], 
-                      capture_output=True, timeout=2)
+        sound_path = AUDIO_SIGNAL_SOUNDS.get(signal_type, AUDIO_SIGNAL_SOUNDS['start'])
+        _AUDIO_PROCESSES[:] = [process for process in _AUDIO_PROCESSES if process.poll() is None]
+        _AUDIO_PROCESSES.append(subprocess.Popen(['afplay', sound_path],
+                                                 stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                                 start_new_session=True))
         print(f"🔊 Audio Signal: {signal_type}")
     except:
         print(f"🔇 Audio signal failed: {signal_type}")
 
 
+def wait_for_audio(timeout: float = AUDIO_WAIT_TIMEOUT):
+    """Let in-flight audio signals finish (each capped at timeout) before exiting."""
+    for process in _AUDIO_PROCESSES:
+        try:
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    _AUDIO_PROCESSES.clear()
+
+
+def wait_until(predicate, timeout: float) -> bool:
+    """
+    Poll predicate until it returns True or timeout expires.
+    
+    Args:
+        predicate: Zero-argument readiness check
+        timeout: Maximum wait in seconds
+        
+    Returns:
+        bool: True if predicate became true within timeout
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if predicate():
+                return True
+        except Exception:
+            pass
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(READY_POLL_INTERVAL)
+
+
+def is_frontmost(app_name: str) -> bool:
+    """Check whether app_name is the frontmost application."""
+    frontmost_app = Cocoa.NSWorkspace.sharedWorkspace().frontmostApplication()
+    return bool(frontmost_app) and frontmost_app.localizedName() == app_name
+
+
+def is_running(app_name: str) -> bool:
+    """Check whether app_name is among the running applications."""
+    return any(app.localizedName() == app_name
+               for app in Cocoa.NSWorkspace.sharedWorkspace().runningApplications())
+
+
+def has_onscreen_window(app_name: str) -> bool:
+    """Check whether app_name owns an on-screen window of usable size."""
+    window_list = Quartz.CGWindowListCopyWindowInfo(
+        Quartz.kCGWindowListOptionOnScreenOnly, Quartz.kCGNullWindowID)
+    for window in window_list:
+        if window.get('kCGWindowOwnerName', '') == app_name:
+            bounds = window.get('kCGWindowBounds', {})
+            if bounds.get('Width', 0) > 100 and bounds.get('Height', 0) > 100:
+                return True
+    return False
+
+
+def run_applescript(action: str, app_name: str) -> tuple:
+    """
+    Run `tell application app_name to action` in-process via NSAppleScript.
+    
+    Each (action, app) pair is compiled once and reused, so no osascript
+    process is spawned per call.
+    
+    Returns:
+        Tuple of (success, error message)
+    """
+    key = (action, app_name)
+    script = _COMPILED_SCRIPTS.get(key)
+    if script is None:
+        script = Cocoa.NSAppleScript.alloc().initWithSource_(f'tell application "{app_name}" to {action}')
+        compiled, error = script.compileAndReturnError_(None)
+        if not compiled:
+            return False, str(error)
+        _COMPILED_SCRIPTS[key] = script
+    
+    result, error = script.executeAndReturnError_(None)
+    return result is not None, '' if error is None else str(error)
+
+
 def focus_application(app_name: str) -> bool:
     """
-    Focus specific application using AppleScript.
+    Focus specific application using in-process AppleScript.
     
     Args:
         app_name: Name of application to focus
@@ -60,20 +165,16 @@ def focus_application(app_name: str) -> bool:
         bool: Success status
     """
     try:
-        script = f'''
-        tell application "{app_name}"
-            activate
-        end tell
-        '''
-        result = subprocess.run(['osascript', '-e', script], 
-                              capture_output=True, text=True, timeout=10)
-        
-        if result.returncode == 0:
+        success, error = run_applescript('activate', app_name)
+        
+        if success:
+            # Wait for the activation to take effect (at most the old fixed 2s)
+            if not wait_until(lambda: is_frontmost(app_name), timeout=2.0):
+                print(f"⚠️  {app_name} activated but not yet frontmost")
             print(f"✅ Focused application: {app_name}")
-            time.sleep(2)  # Allow focus to take effect
             return True
         else:
-            print(f"❌ Failed to focus {app_name}: {result.stderr}")
+            print(f"❌ Failed to focus {app_name}: {error}")
             return False
     except Exception as e:
         print(f"❌ Focus application failed: {e}")
@@ -82,7 +183,7 @@ def focus_application(app_name: str) -> bool:
 
 def close_application(app_name: str) -> bool:
     """
-    Properly close application using AppleScript.
+    Properly close application using in-process AppleScript.
     
     Args:
         app_name: Name of application to close
@@ -91,20 +192,14 @@ def close_application(app_name: str) -> bool:
         bool: Success status
     """
     try:
-        script = f'''
-        tell application "{app_name}"
-            quit
-        end tell
-        '''
-        result = subprocess.run(['osascript', '-e', script], 
-                              capture_output=True, text=True, timeout=10)
-        
-        if result.returncode == 0:
+        success, error = run_applescript('quit', app_name)
+        
+        if success:
             print(f"✅ Closed application: {app_name}")
-            time.sleep(3)  # Allow application to close
+            wait_until(lambda: not is_running(app_name), timeout=3.0)  # Allow application to close
             return True
         else:
-            print(f"⚠️  Close attempt for {app_name}: {result.stderr}")
+            print(f"⚠️  Close attempt for {app_name}: {error}")
             return True  # May already be closed
     except Exception as e:
         print(f"❌ Close application failed: {e}")
@@ -143,8 +238,9 @@ def launch_dune_legacy() -> bool:
         subprocess.Popen(['open', dune_path])
         print(f"✅ Launched: {dune_path}")
         
-        # Wait for application to start
-        time.sleep(8)
+        # Wait for the game's main window instead of a fixed 8s delay
+        if not wait_until(lambda: has_onscreen_window('Dune Legacy'), timeout=8.0):
+            print("⚠️  Dune Legacy window not visible after 8s")
         
         # Focus the application
         focus_success = focus_application('Dune Legacy')
@@ -181,9 +277,8 @@ def capture_gameplay_screenshot(save_path: str) -> bool:
         play_audio_signal('progress')
         print("📸 Capturing gameplay screenshot...")
         
-        # Ensure Dune Legacy is focused
+        # Ensure Dune Legacy is focused (focus_application waits for frontmost)
         focus_application('Dune Legacy')
-        time.sleep(2)
         
         # Initialize screen capture
         capture = GameScreenCapture()
@@ -255,59 +350,59 @@ def execute_m3_pipeline_validation(screenshot_path: str):
         # Analyze top detections
         if semantic_map.elements:
             print("\n🎯 TOP 3 DETECTIONS ANALYSIS:")
-            sorted_elements = sorted(semantic_map.elements, 
-                                   key=lambda x: x.confidence_score, reverse=True)
+            top_elements = nlargest(3, semantic_map.elements, key=attrgetter('confidence_score'))
             
-            for i, element in enumerate(sorted_elements[:3]):
+            # Validate coordinate normalization for all top detections at once
+            img_width, img_height = test_image.size
+            bboxes = np.array([e.bounding_box for e in top_elements], dtype=np.float32)
+            normalized = bboxes / np.array([img_width, img_height, img_width, img_height], dtype=np.float32)
+            coords_valid = ((normalized >= 0) & (normalized <= 1)).all(axis=1)
+            
+            for i, element in enumerate(top_elements):
                 print(f"   Detection {i+1}:")
                 print(f"     Label: {element.element_label}")
                 print(f"     Semantic Value: {element.semantic_value}")
                 print(f"     Confidence: {element.confidence_score:.3f}")
                 print(f"     Bounding Box: {element.bounding_box}")
-                
-                # Validate coordinate normalization
-                x1, y1, x2, y2 = element.bounding_box
-                img_width, img_height = test_image.size
-                
-                normalized_coords = (
-                    x1 / img_width, y1 / img_height,
-                    x2 / img_width, y2 / img_height
-                )
-                
-                coords_valid = all(0.0 <= coord <= 1.0 for coord in normalized_coords)
-                print(f"     Normalized Coords: {[f'{c:.3f}' for c in normalized_coords]}")
-                print(f"     Coordinates Valid: {'✅' if coords_valid else '❌'}")
+                print(f"     Normalized Coords: {np.array2string(normalized[i], precision=3, floatmode='fixed')}")
+                print(f"     Coordinates Valid: {'✅' if coords_valid[i] else '❌'}")
                 print()
         
         # Generate JSON output for analysis
         print("📄 SEMANTIC MAP JSON SERIALIZATION:")
         try:
-            # Convert to JSON-serializable format
+            # Convert to JSON-serializable format; the label type is uniform across
+            # elements, so decide once how to render it
+            elements = semantic_map.elements
+            if elements and hasattr(elements[0].element_label, 'name'):
+                get_label = attrgetter('element_label.name')
+            else:
+                get_label = lambda e: str(e.element_label)
+            
             map_data = {
                 'timestamp': semantic_map.timestamp,
                 'screen_resolution': semantic_map.screen_resolution,
-                'detection_count': len(semantic_map.elements),
-                'elements': []
+                'detection_count': len(elements),
+                'elements': [{
+                    'element_id': e.element_id,
+                    'element_label': get_label(e),
+                    'bounding_box': list(e.bounding_box),
+                    'confidence_score': float(e.confidence_score),
+                    'semantic_value': e.semantic_value,
+                    'detection_method': e.detection_method
+                } for e in elements]
             }
             
-            for element in semantic_map.elements:
-                element_data = {
-                    'element_id': element.element_id,
-                    'element_label': element.element_label.name if hasattr(element.element_label, 'name') else str(element.element_label),
-                    'bounding_box': list(element.bounding_box),
-                    'confidence_score': float(element.confidence_score),
-                    'semantic_value': element.semantic_value,
-                    'detection_method': element.detection_method
-                }
-                map_data['elements'].append(element_data)
+            if ORJSON_AVAILABLE:
+                json_bytes = orjson.dumps(map_data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+            else:
+                json_bytes = json.dumps(map_data, indent=2).encode()
+            print(json_bytes.decode())
             
-            json_output = json.dumps(map_data, indent=2)
-            print(json_output)
-            
-            # Save JSON output for analysis
+            # Save JSON output for analysis (bytes straight to disk)
             json_path = screenshot_path.replace('.png', '_semantic_map.json')
-            with open(json_path, 'w') as f:
-                f.write(json_output)
+            with open(json_path, 'wb') as f:
+                f.write(json_bytes)
             print(f"\n💾 JSON output saved: {json_path}")
             
         except Exception as e:
@@ -372,6 +467,8 @@ def cleanup_and_refocus():
     except Exception as e:
         print(f"❌ Cleanup failed: {e}")
         play_audio_signal('error')
+    finally:
+        wait_for_audio()
 
 
 def main():
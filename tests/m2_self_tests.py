@@ -10,6 +10,12 @@ import traceback
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass, asdict
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Import our M2 modules
 from src.perception.perception_module import PerceptionModule
 from src.perception.element_location import ElementLocationModule
@@ -936,8 +942,14 @@ class M2SelfTestSuite:
         """Save test report to file."""
         try:
             report_path = "/tmp/m2_test_report.json"
-            with open(report_path, 'w') as f:
-                json.dump(report, f, indent=2, default=str)
+            if ORJSON_AVAILABLE:
+                # orjson writes bytes directly and handles numpy values in test details
+                with open(report_path, 'wb') as f:
+                    f.write(orjson.dumps(report, default=str, option=(
+                        orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)))
+            else:
+                with open(report_path, 'w') as f:
+                    json.dump(report, f, indent=2, default=str)
             
             print(f"\n📊 Test report saved to: {report_path}")
             